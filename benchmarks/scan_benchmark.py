@@ -0,0 +1,105 @@
+"""Compare os.walk against ParallelScanner on deep and wide trees.
+
+    python benchmarks/scan_benchmark.py              # synthetic trees in a temp dir
+    python benchmarks/scan_benchmark.py --root PATH  # an existing tree, e.g. a network share
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallel_scanner import ParallelScanner
+
+def make_deep(root, depth=10, fanout=2, files=5):
+    def build(path, level):
+        os.makedirs(path, exist_ok=True)
+        for i in range(files):
+            with open(os.path.join(path, f"f{i}.dat"), 'wb') as f:
+                f.write(b'x' * (i * 100))
+        if level < depth:
+            for i in range(fanout):
+                build(os.path.join(path, f"d{i}"), level + 1)
+    build(root, 0)
+
+def make_wide(root, dirs=2000, files=20):
+    for d in range(dirs):
+        path = os.path.join(root, f"dir{d:05d}")
+        os.makedirs(path)
+        for i in range(files):
+            with open(os.path.join(path, f"f{i}.dat"), 'wb') as f:
+                f.write(b'x' * i)
+
+def walk_sizes(root):
+    """The pattern the dashboard used: os.walk plus isfile and getsize per file"""
+    count = 0
+    total = 0
+    for root_dir, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(root_dir, filename)
+            if os.path.isfile(path):
+                count += 1
+                total += os.path.getsize(path)
+    return count, total
+
+def parallel_sizes(root, workers):
+    scanner = ParallelScanner(workers)
+
+    def visit(rel_dir, path):
+        try:
+            files, subdirs = scanner.list_dir(path)
+        except OSError:
+            return (0, 0), []
+        return ((len(files), sum(st.st_size for _, st in files)),
+                [os.path.join(rel_dir, name) if rel_dir else name for name in subdirs])
+
+    count = 0
+    total = 0
+    for _, (n, size) in scanner.walk(root, visit):
+        count += n
+        total += size
+    return count, total
+
+def timed(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run(name, root, worker_counts):
+    base, expected = timed(walk_sizes, root)
+    print(f"\n{name}: {expected[0]} files, {expected[1]} bytes")
+    print(f"  {'os.walk + getsize':<24}{base * 1000:9.1f} ms")
+    for workers in worker_counts:
+        elapsed, result = timed(parallel_sizes, root, workers)
+        status = "" if result == expected else "  MISMATCH"
+        print(f"  {f'parallel x{workers}':<24}{elapsed * 1000:9.1f} ms  ({base / elapsed:.2f}x){status}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--root', help="benchmark an existing directory instead of synthetic trees")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    if args.root:
+        run(args.root, args.root, args.workers)
+        return
+
+    tmp = tempfile.mkdtemp(prefix='scan_benchmark_')
+    try:
+        deep = os.path.join(tmp, 'deep')
+        wide = os.path.join(tmp, 'wide')
+        make_deep(deep)
+        make_wide(wide)
+        run("deep (depth 10, fanout 2)", deep, args.workers)
+        run("wide (2000 dirs x 20 files)", wide, args.workers)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import os
+import json
+import hashlib
+import tempfile
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+def cache_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '.stats_cache', 'charts')
+
+class ChartRenderer:
+    """Render single-axes charts to PNG files, cached by the data they show.
+
+    Only the object-oriented Figure API and the Agg canvas are used, never
+    pyplot, so rendering can run on a worker thread. A chart whose name,
+    size and data are unchanged is served from the cache without drawing.
+    """
+
+    VERSION = 1  # bump when a plot function changes how it draws
+    DPI = 100
+    MAX_FILES = 200
+
+    def __init__(self, directory=None):
+        self.directory = directory or cache_dir()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, name, size, data):
+        payload = json.dumps([self.VERSION, name, size, data], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def cached(self, name, size, data):
+        """Path of an already rendered chart, or None"""
+        path = os.path.join(self.directory, self.key(name, size, data) + '.png')
+        return path if os.path.exists(path) else None
+
+    def render(self, name, size, data, plot):
+        """PNG path for plot(ax, data) drawn on a figure of size inches"""
+        path = os.path.join(self.directory, self.key(name, size, data) + '.png')
+        if os.path.exists(path):
+            os.utime(path)  # keep recently used charts out of prune()
+            return path
+        fig = Figure(figsize=size, facecolor='#f0f0f0')
+        FigureCanvasAgg(fig)
+        plot(fig.add_subplot(1, 1, 1), data)
+        fig.tight_layout(pad=1.5)
+        # A private temp file, so concurrent renders of one chart never share it
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                fig.savefig(f, format='png', dpi=self.DPI, facecolor=fig.get_facecolor())
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def prune(self):
+        """Drop the least recently used charts beyond MAX_FILES"""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith('.png')]
+        except OSError:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in entries[self.MAX_FILES:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
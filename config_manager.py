@@ -2,12 +2,27 @@ import os
 import json
 import shutil
 import time
+from rule_engine import RuleEngine
+from content_sniffer import ContentSniffer
 from tkinter import Toplevel, Frame, Button, Label, Entry, Listbox, StringVar
+from tkinter import Checkbutton, BooleanVar
 from tkinter import LEFT, RIGHT, W, X, Y, END, simpledialog
 
 class ConfigManager:
     
+    # Plain-text formats worth indexing for content search, whatever category
+    # they are configured under
+    TEXT_EXTENSIONS = frozenset({
+        '.txt', '.csv', '.md', '.log', '.ini', '.cfg', '.conf', '.yaml', '.yml', '.toml',
+        '.json', '.xml', '.html', '.htm', '.css', '.py', '.js', '.ts', '.java', '.c', '.h',
+        '.cpp', '.hpp', '.cs', '.go', '.rs', '.rb', '.php', '.sh', '.bat', '.ps1', '.sql'
+    })
+    
     def __init__(self):
+        self.ext_index = {}
+        self.max_ext_parts = 1
+        self.rule_engine = RuleEngine()
+        self.sniffer = ContentSniffer()
         self.config = self.load_config()
     
     def default_config(self):
@@ -56,6 +71,19 @@ class ConfigManager:
             if norm_exts:
                 norm["categories"][safe_folder] = norm_exts
         
+        rules = []
+        for rule in cfg.get('rules') or []:
+            rule = self.rule_engine.normalize_rule(rule)
+            if rule is None:
+                continue
+            if rule.get('folder'):
+                rule['folder'] = self.sanitize_folder_name(rule['folder'])
+            rules.append(rule)
+        if rules:
+            norm["rules"] = rules
+        if cfg.get('sniff_content'):
+            norm["sniff_content"] = True
+        
         return norm
     
     def load_config(self, directory=None):
@@ -65,7 +93,7 @@ class ConfigManager:
                 if os.path.exists(p):
                     with open(p, 'r', encoding='utf-8') as f:
                         config = self.normalize_config(json.load(f))
-                        self.config = config
+                        self._apply_config(config)
                         return config
             except Exception:
                 pass
@@ -75,13 +103,13 @@ class ConfigManager:
             if os.path.exists(p):
                 with open(p, 'r', encoding='utf-8') as f:
                     config = self.normalize_config(json.load(f))
-                    self.config = config
+                    self._apply_config(config)
                     return config
         except Exception:
             pass
         
         config = self.default_config()
-        self.config = config
+        self._apply_config(config)
         return config
     
     def save_config(self, config, directory=None):
@@ -98,19 +126,90 @@ class ConfigManager:
         with open(target, 'w', encoding='utf-8') as f:
             json.dump(cfg, f, indent=2)
         
-        self.config = cfg
+        self._apply_config(cfg)
         return cfg
     
     def get_config(self):
    
         return self.config
     
+    def _apply_config(self, config):
+        self.config = config
+        self.build_ext_index(config)
+        self.rule_engine.compile(config.get('rules', []))
+    
+    def build_ext_index(self, config):
+        """Compile the categories into a reverse extension -> folder map"""
+        index = {}
+        for folder, exts in config.get('categories', {}).items():
+            for ext in exts:
+                # First category listing an extension wins, as in the old scan
+                index.setdefault(ext, folder)
+        
+        self.ext_index = index
+        self.max_ext_parts = max((ext.count('.') for ext in index), default=1)
+        return index
+    
     def ext_to_category(self, ext):
         ext = self.normalize_extension(ext)
-        for folder, exts in self.config.get('categories', {}).items():
-            if ext in exts:
-                return folder
-        return self.config.get('default_folder', 'Others')
+        return self.ext_index.get(ext, self.config.get('default_folder', 'Others'))
+    
+    def split_extension(self, filename):
+        """Return the longest configured extension of filename (e.g. .tar.gz)"""
+        name = os.path.basename(filename).lstrip('.').lower()
+        parts = name.split('.')
+        for n in range(min(self.max_ext_parts, len(parts) - 1), 1, -1):
+            ext = '.' + '.'.join(parts[-n:])
+            if ext in self.ext_index:
+                return ext
+        return '.' + parts[-1] if len(parts) > 1 else ''
+    
+    def text_extensions(self):
+        """Configured extensions that are plain text, for full-text indexing"""
+        return self.TEXT_EXTENSIONS & self.ext_index.keys()
+    
+    def classify_name(self, filename):
+        """Return (extension, category) for a file name"""
+        ext = self.split_extension(filename)
+        return ext, self.ext_index.get(ext, self.config.get('default_folder', 'Others'))
+    
+    def output_folders(self):
+        """Folder names organize may create at the top of a directory"""
+        folders = set(self.config.get('categories', {}))
+        folders.add(self.config.get('default_folder', 'Others'))
+        folders.update(r['folder'] for r in self.rule_engine.rules if r['folder'])
+        return folders
+    
+    def classify_entries(self, items):
+        """Classify (entry, rel_path) pairs, returning [(path, folder)] in order.
+        
+        Files whose extension is unknown are content-sniffed in parallel when
+        "sniff_content" is enabled in the config.
+        """
+        default = self.config.get('default_folder', 'Others')
+        sniff = self.config.get('sniff_content', False)
+        results = []
+        unknown = []
+        
+        for entry, rel_path in items:
+            rule = self.rule_engine.match(entry.name, rel_path, entry)
+            if rule is not None:
+                results.append((entry.path, rule['folder']))
+                continue
+            ext, folder = self.classify_name(entry.name)
+            if sniff and ext not in self.ext_index:
+                unknown.append((len(results), entry))
+            results.append((entry.path, folder))
+        
+        if unknown:
+            sniffed = self.sniffer.sniff_many(entry for _, entry in unknown)
+            for (i, entry), exts in zip(unknown, sniffed):
+                for ext in exts or ():
+                    if ext in self.ext_index:
+                        results[i] = (entry.path, self.ext_index[ext])
+                        break
+        
+        return results
     
     def open_categories_editor(self, root, directory=None):
         cfg = json.loads(json.dumps(self.config))
@@ -137,6 +236,10 @@ class ConfigManager:
         exts_var = StringVar(value="")
         Entry(right, textvariable=exts_var).pack(fill=X)
         
+        sniff_var = BooleanVar(value=cfg.get('sniff_content', False))
+        Checkbutton(right, text="Detect type from file content when the extension is unknown",
+                    variable=sniff_var).pack(anchor=W, pady=(10, 0))
+        
         msg_var = StringVar(value="")
         Label(right, textvariable=msg_var, fg="red").pack(anchor=W, pady=(6, 0))
         
@@ -192,6 +295,7 @@ class ConfigManager:
                 cfg['categories'][folder] = norm
             
             cfg['default_folder'] = self.sanitize_folder_name(default_var.get() or 'Others')
+            cfg['sniff_content'] = sniff_var.get()
                 
             seen = {}
             for folder, exts in cfg['categories'].items():
@@ -0,0 +1,152 @@
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WORD_RE = re.compile(r'\w+')
+
+class ContentIndex:
+    """Full-text index of text files, stored next to a SearchDatabase's file rows.
+
+    Text files are those whose configured extension is a plain-text format.
+    update() re-reads only files whose size or mtime changed since they were
+    indexed, on a bounded pool of reader threads. search() ranks hits with
+    BM25 and returns the first matching line of each file as a snippet.
+    """
+
+    MAX_BYTES = 2 * 1024 * 1024
+    BATCH_SIZE = 64
+    SNIPPET_CHARS = 160
+
+    def __init__(self, database, config_manager, max_workers=4):
+        self.database = database
+        self.config_manager = config_manager
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.conn = database.connect()
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS contents USING fts5(body, tokenize='unicode61');
+                CREATE TABLE IF NOT EXISTS content_state (
+                    id INTEGER PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER
+                );
+            """)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def read_text(self, path):
+        """Text of a file, or None if it is unreadable or looks binary"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(self.MAX_BYTES)
+        except OSError:
+            return None
+        if b'\0' in data[:8192]:
+            return None
+        return data.decode('utf-8', errors='replace')
+
+    def _check(self, item):
+        """Re-stat one text file; returns (id, path, size, mtime_ns) if it needs indexing"""
+        file_id, path, old_size, old_mtime = item
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) == (old_size, old_mtime):
+            return None
+        return file_id, path, st.st_size, st.st_mtime_ns
+
+    def text_files(self):
+        """(id, path, indexed size, indexed mtime_ns) of every text file in the tree"""
+        root = self.database.root
+        extensions = self.config_manager.text_extensions()
+        split_extension = self.config_manager.split_extension
+        with self.lock:
+            rows = self.conn.execute("""
+                SELECT f.id, f.rel_path, f.name, s.size, s.mtime_ns
+                FROM files f LEFT JOIN content_state s ON s.id = f.id
+            """).fetchall()
+        return [(file_id, os.path.join(root, rel_path), old_size, old_mtime)
+                for file_id, rel_path, name, old_size, old_mtime in rows
+                if split_extension(name) in extensions]
+
+    def update(self, cancelled=None, progress=None):
+        """Index new and changed text files; returns how many were (re)indexed, None if cancelled"""
+        with self.lock, self.conn:
+            # Rows of files that left the tree
+            self.conn.execute("DELETE FROM contents WHERE rowid NOT IN (SELECT id FROM files)")
+            self.conn.execute("DELETE FROM content_state WHERE id NOT IN (SELECT id FROM files)")
+
+        candidates = self.text_files()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for start in range(0, len(candidates), self.BATCH_SIZE):
+                if cancelled is not None and cancelled():
+                    return None
+                # Every text file is stat'ed against the size and mtime it was
+                # indexed at, so files edited in place are re-read too
+                batch = [item for item in pool.map(self._check, candidates[start:start + self.BATCH_SIZE])
+                         if item is not None]
+                if not batch:
+                    continue
+                texts = list(pool.map(lambda item: self.read_text(item[1]), batch))
+                with self.lock, self.conn:
+                    for (file_id, _, size, mtime_ns), text in zip(batch, texts):
+                        self.conn.execute("DELETE FROM contents WHERE rowid = ?", (file_id,))
+                        if text:
+                            self.conn.execute("INSERT INTO contents (rowid, body) VALUES (?, ?)",
+                                              (file_id, text))
+                        self.conn.execute("INSERT OR REPLACE INTO content_state (id, size, mtime_ns) "
+                                          "VALUES (?, ?, ?)", (file_id, size, mtime_ns))
+                done += len(batch)
+                if progress is not None:
+                    progress(min(start + self.BATCH_SIZE, len(candidates)), len(candidates))
+        return done
+
+    def match_expression(self, query):
+        words = WORD_RE.findall(query.lower())
+        if not words:
+            return None, []
+        # The last word is usually still being typed, so it matches as a prefix
+        terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+        return ' '.join(terms), words
+
+    def snippet(self, body, words):
+        """(line number, line text) of the first line mentioning the query"""
+        lowered = body.lower()
+        pos = -1
+        for word in words:
+            m = re.search(r'\b' + re.escape(word), lowered)
+            if m:
+                pos = m.start()
+                break
+        if pos < 0:
+            return 1, body[:self.SNIPPET_CHARS].strip()
+        line_start = body.rfind('\n', 0, pos) + 1
+        line_end = body.find('\n', pos)
+        if line_end < 0:
+            line_end = len(body)
+        line = body[line_start:line_end].strip()
+        if len(line) > self.SNIPPET_CHARS:
+            offset = max(0, pos - line_start - self.SNIPPET_CHARS // 3)
+            line = line[offset:offset + self.SNIPPET_CHARS]
+        return body.count('\n', 0, pos) + 1, line
+
+    def search(self, query, limit=500):
+        """Best-ranked hits as (file id, line number, snippet)"""
+        expression, words = self.match_expression(query)
+        if expression is None:
+            return []
+        with self.lock:
+            try:
+                rows = self.conn.execute(
+                    "SELECT rowid, body FROM contents WHERE contents MATCH ? ORDER BY rank LIMIT ?",
+                    (expression, limit)).fetchall()
+            except sqlite3.OperationalError:
+                return []
+        return [(file_id, *self.snippet(body, words)) for file_id, body in rows]
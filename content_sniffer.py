@@ -0,0 +1,93 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+HEADER_BYTES = 512
+
+# (conditions, candidate extensions). Every (offset, magic) condition must hold;
+# the first candidate extension present in the config decides the category.
+SIGNATURES = [
+    ([(0, b'%PDF-')], ('.pdf',)),
+    ([(0, b'\x89PNG\r\n\x1a\n')], ('.png',)),
+    ([(0, b'\xff\xd8\xff')], ('.jpg', '.jpeg')),
+    ([(0, b'GIF87a')], ('.gif',)),
+    ([(0, b'GIF89a')], ('.gif',)),
+    ([(0, b'RIFF'), (8, b'WEBP')], ('.webp',)),
+    ([(0, b'RIFF'), (8, b'WAVE')], ('.wav', '.mp3')),
+    ([(0, b'RIFF'), (8, b'AVI ')], ('.avi', '.mp4')),
+    ([(0, b'PK\x03\x04'), (30, b'[Content_Types].xml')], ('.docx', '.pptx', '.xlsx')),
+    ([(0, b'PK\x03\x04'), (30, b'AndroidManifest.xml')], ('.apk',)),
+    ([(0, b'PK\x03\x04')], ('.zip',)),
+    ([(0, b'Rar!\x1a\x07')], ('.rar',)),
+    ([(0, b"7z\xbc\xaf'\x1c")], ('.7z',)),
+    ([(0, b'\x1f\x8b')], ('.tar.gz', '.gz')),
+    ([(4, b'ftyp')], ('.mp4', '.mov', '.m4a')),
+    ([(0, b'\x1aE\xdf\xa3')], ('.mkv', '.webm')),
+    ([(0, b'ID3')], ('.mp3',)),
+    ([(0, b'\xff\xfb')], ('.mp3',)),
+    ([(0, b'OggS')], ('.ogg', '.mp3')),
+    ([(0, b'fLaC')], ('.flac', '.mp3')),
+    ([(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')], ('.doc', '.ppt', '.msi')),
+    # Native executables have no dedicated category, so fall back to .exe's
+    ([(0, b'\x7fELF')], ('.elf', '.exe')),
+    ([(0, b'MZ')], ('.exe',)),
+    ([(0, b'\xcf\xfa\xed\xfe')], ('.app', '.exe')),
+    ([(0, b'\xca\xfe\xba\xbe')], ('.app', '.exe')),
+]
+
+class ContentSniffer:
+    """Guess a file's type from its first bytes, cached by file identity"""
+
+    def __init__(self, max_workers=8, cache_size=100000):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def match_header(self, header):
+        for conditions, exts in SIGNATURES:
+            if all(header[off:off + len(magic)] == magic for off, magic in conditions):
+                return exts
+        return None
+
+    def identity(self, path, st):
+        # DirEntry.stat() on Windows leaves st_ino at 0, so fall back to the path
+        key = (st.st_dev, st.st_ino) if st.st_ino else path
+        return key, st.st_size, st.st_mtime_ns
+
+    def sniff(self, entry):
+        """Return candidate extensions for a scandir entry (or path), or None"""
+        path = entry.path if hasattr(entry, 'path') else entry
+        try:
+            st = entry.stat() if hasattr(entry, 'stat') else os.stat(path)
+        except OSError:
+            return None
+
+        key = self.identity(path, st)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(HEADER_BYTES)
+        except OSError:
+            return None
+        exts = self.match_header(header)
+
+        with self.lock:
+            self.cache[key] = exts
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return exts
+
+    def sniff_many(self, entries):
+        """Sniff entries in parallel, results in the same order"""
+        entries = list(entries)
+        if len(entries) <= 1:
+            return [self.sniff(e) for e in entries]
+        workers = min(self.max_workers, len(entries))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.sniff, entries))
@@ -0,0 +1,140 @@
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from send2trash import send2trash
+
+class DeleteResult:
+    """Outcome of one delete request"""
+
+    def __init__(self):
+        self.deleted = []
+        self.missing = []
+        self.errors = []
+        self.fallback = []  # (path, destination) for files moved to the fallback folder
+
+    def merge(self, other):
+        self.deleted.extend(other.deleted)
+        self.missing.extend(other.missing)
+        self.errors.extend(other.errors)
+        self.fallback.extend(other.fallback)
+        return self
+
+    def as_dict(self):
+        return {
+            "deleted": self.deleted,
+            "missing": self.missing,
+            "errors": self.errors,
+            "fallback": self.fallback
+        }
+
+class DeleteExecutor:
+    """Send files to the Recycle Bin in parallel batches.
+
+    Files the Recycle Bin refuses are moved into fallback_dir instead; names
+    already taken there are indexed once so each collision resolves in O(1).
+    The index is only a hint: a name is claimed by creating the file
+    exclusively, so one that appeared since is never overwritten.
+    """
+
+    def __init__(self, fallback_dir, batch_size=100, max_workers=4):
+        self.fallback_dir = fallback_dir
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self._taken = None
+        self._next_suffix = {}
+
+    @staticmethod
+    def normalize_path(path):
+        if not path:
+            return path
+        path = str(path)
+        if path.startswith('\\\\?\\'):
+            path = path[4:]
+        return os.path.abspath(os.path.normpath(path))
+
+    def reserve_fallback_path(self, filename):
+        """Claim a free name in the fallback folder by creating an empty file there"""
+        with self.lock:
+            if self._taken is None:
+                os.makedirs(self.fallback_dir, exist_ok=True)
+                self._taken = set(os.listdir(self.fallback_dir))
+            base, ext = os.path.splitext(filename)
+            name = filename
+            i = self._next_suffix.get(filename, 1)
+            while True:
+                if name not in self._taken:
+                    path = os.path.join(self.fallback_dir, name)
+                    try:
+                        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    except FileExistsError:
+                        pass  # appeared since the folder was indexed
+                    else:
+                        self._taken.add(name)
+                        if name != filename:
+                            self._next_suffix[filename] = i
+                        return path
+                    self._taken.add(name)
+                name = f"{base}({i}){ext}"
+                i += 1
+
+    def _delete_one(self, path, result):
+        try:
+            send2trash(path)
+            result.deleted.append(path)
+            return
+        except Exception:
+            pass
+        dest = None
+        try:
+            dest = self.reserve_fallback_path(os.path.basename(path))
+            # Replaces only the placeholder this executor just created
+            shutil.move(path, dest)
+            result.deleted.append(path)
+            result.fallback.append((path, dest))
+        except Exception as e_move:
+            if dest is not None and os.path.lexists(path):
+                try:
+                    os.remove(dest)
+                except OSError:
+                    pass
+            result.errors.append((path, f"fallback move error: {e_move}"))
+
+    def _delete_batch(self, paths):
+        result = DeleteResult()
+        try:
+            send2trash(paths)
+            result.deleted.extend(paths)
+            return result
+        except Exception:
+            pass
+        # Some path in the batch failed; retry individually, skipping ones already gone
+        for path in paths:
+            if not os.path.lexists(path):
+                result.deleted.append(path)
+                continue
+            self._delete_one(path, result)
+        return result
+
+    def execute(self, file_paths):
+        result = DeleteResult()
+        existing = []
+        for raw_path in file_paths:
+            try:
+                path = self.normalize_path(raw_path)
+                if os.path.lexists(path):
+                    existing.append(path)
+                else:
+                    result.missing.append(path)
+            except Exception as e:
+                result.errors.append((raw_path, str(e)))
+
+        batches = [existing[i:i + self.batch_size] for i in range(0, len(existing), self.batch_size)]
+        if len(batches) == 1:
+            return result.merge(self._delete_batch(batches[0]))
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                for batch_result in pool.map(self._delete_batch, batches):
+                    result.merge(batch_result)
+        return result
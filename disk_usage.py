@@ -0,0 +1,61 @@
+import os
+import heapq
+
+class DiskUsage:
+    """Rolled-up directory sizes built from per-directory statistics records.
+
+    Every directory's subtree totals are computed once, bottom up, so
+    drilling into any subtree and asking for its largest files or folders
+    only touches the records already in memory.
+    """
+
+    def __init__(self, records):
+        self.own = {}
+        self.largest = {}
+        self.children = {}
+        for rel_dir, parent, files, size, largest in records:
+            self.own[rel_dir] = (size, files)
+            self.largest[rel_dir] = largest
+            if parent is not None:
+                self.children.setdefault(parent, []).append(rel_dir)
+
+        self.totals = {rel_dir: list(own) for rel_dir, own in self.own.items()}
+        # Deepest first, so each directory is complete before it is added to its parent
+        for rel_dir in sorted(self.own, key=lambda d: d.count(os.sep) if d else -1, reverse=True):
+            if not rel_dir:
+                continue
+            parent_total = self.totals.get(os.path.dirname(rel_dir))
+            if parent_total is not None:
+                parent_total[0] += self.totals[rel_dir][0]
+                parent_total[1] += self.totals[rel_dir][1]
+
+    def total(self, rel_dir):
+        """(bytes, files) of the whole subtree"""
+        return tuple(self.totals.get(rel_dir, (0, 0)))
+
+    def children_of(self, rel_dir):
+        """Immediate subdirectories, largest subtree first"""
+        return sorted(self.children.get(rel_dir, []), key=lambda d: self.totals[d][0], reverse=True)
+
+    def subtree(self, rel_dir):
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(self.children.get(current, []))
+
+    def top_files(self, rel_dir='', k=20):
+        """[(size, rel_path)] of the k largest files in the subtree.
+
+        Exact for k up to the number of largest files each record keeps, since
+        the subtree's top k are then necessarily among those lists.
+        """
+        candidates = ((size, os.path.join(d, name) if d else name)
+                      for d in self.subtree(rel_dir) for size, name in self.largest.get(d, []))
+        return heapq.nlargest(k, candidates)
+
+    def top_dirs(self, rel_dir='', k=50):
+        """[(size, files, rel_dir)] of the k largest directories below rel_dir"""
+        candidates = ((self.totals[d][0], self.totals[d][1], d)
+                      for d in self.subtree(rel_dir) if d != rel_dir)
+        return heapq.nlargest(k, candidates)
@@ -1,4 +1,5 @@
 import os
+import heapq
 import hashlib
 
 class DuplicateFinder:
@@ -7,6 +8,7 @@ class DuplicateFinder:
     def __init__(self):
         self.hash_to_paths = {}
         self.duplicate_groups = []
+        self.file_sizes = {}
     
     def compute_file_hash(self, file_path, chunk_size=1024 * 1024):
         
@@ -25,11 +27,16 @@ class DuplicateFinder:
     def scan_directory(self, directory):
        
         self.hash_to_paths = {}
+        self.file_sizes = {}
         
         for root_dir, _, files in os.walk(directory):
             for name in files:
                 file_path = os.path.join(root_dir, name)
                 
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError:
+                    continue
                 if not os.path.isfile(file_path):
                     continue
                 
@@ -37,15 +44,47 @@ class DuplicateFinder:
                 if not file_hash:
                     continue
                 
+                self.file_sizes[file_path] = size
                 self.hash_to_paths.setdefault(file_hash, []).append(file_path)
         
         self.duplicate_groups = [
             paths for paths in self.hash_to_paths.values() 
             if len(paths) > 1
         ]
+        # Review the groups that free the most space first
+        self.duplicate_groups.sort(key=self.wasted_bytes, reverse=True)
         
         return self.duplicate_groups
     
     def get_duplicate_groups(self):
         
-        return self.duplicate_groups
\ No newline at end of file
+        return self.duplicate_groups
+    
+    def group_size(self, paths):
+        """Size of one copy in a group"""
+        for path in paths:
+            if path in self.file_sizes:
+                return self.file_sizes[path]
+        return 0
+    
+    def wasted_bytes(self, paths):
+        """Bytes freed by keeping a single copy of the group"""
+        return self.group_size(paths) * max(len(paths) - 1, 0)
+    
+    def group_summary(self, index):
+        paths = self.duplicate_groups[index]
+        size = self.group_size(paths)
+        return {
+            "index": index,
+            "count": len(paths),
+            "size": size,
+            "wasted": size * max(len(paths) - 1, 0)
+        }
+    
+    def top_groups(self, k):
+        """The k groups with the most reclaimable bytes, largest first"""
+        summaries = (self.group_summary(i) for i in range(len(self.duplicate_groups)))
+        return heapq.nlargest(k, summaries, key=lambda s: s["wasted"])
+    
+    def total_wasted(self):
+        return sum(self.wasted_bytes(paths) for paths in self.duplicate_groups)
@@ -1,21 +1,40 @@
 import os
-import json
 import time
+import queue
 import shutil
+import threading
 from tkinter import Toplevel, Frame, Button, Label, StringVar, Scrollbar, CENTER, W
-from tkinter import LEFT, RIGHT, X, Y, BOTH, END, filedialog, messagebox
+from tkinter import LEFT, RIGHT, X, Y, BOTH, END, Entry, Radiobutton, filedialog, messagebox
 from tkinter import ttk
-from send2trash import send2trash
+from event_log import EventLog
+from duplicate_resolver import DuplicateResolver
+from duplicate_linker import DuplicateLinker
+from delete_executor import DeleteExecutor
+from file_operations import TRASH_FOLDER
+from group_index import GroupIndex
 
 class DuplicateHandler:
     
+    PAGE_SIZE = 200
+    WORK_POLL_MS = 100
+    
     def __init__(self, root, duplicate_finder):
         self.root = root
         self.duplicate_finder = duplicate_finder
         self.current_group_index = 0
         self.log_path = None
+        self.event_log = None
         self.directory = None
         self.dup_window = None
+        self.resolver = DuplicateResolver()
+        self.page = 0
+        self._rendered_index = None
+        self._select_all_but_first = False
+        self.linker = DuplicateLinker()
+        self.delete_executor = None
+        self.group_index = None
+        self.busy = False
+        self.groups_version = 0  # bumped whenever the group list changes
     
     def find_and_show_duplicates(self, directory, status_label):
         self.directory = directory
@@ -27,7 +46,11 @@ class DuplicateHandler:
             return
         
         self.current_group_index = 0
-        self.log_path = os.path.join(directory, 'duplicates_log.json')
+        self._rendered_index = None
+        self.delete_executor = DeleteExecutor(os.path.join(directory, TRASH_FOLDER))
+        self.log_path = os.path.join(directory, 'duplicates_log.jsonl')
+        self.event_log = EventLog(self.log_path)
+        self.event_log.import_legacy(os.path.join(directory, 'duplicates_log.json'))
         self.open_duplicates_window()
     
     def open_duplicates_window(self):
@@ -43,6 +66,8 @@ class DuplicateHandler:
         self.group_label_var = StringVar()
         Label(header_frame, textvariable=self.group_label_var, 
               font=("Arial", 12, "bold")).pack(side=LEFT)
+        Button(header_frame, text="Overview...", 
+               command=self.open_overview).pack(side=RIGHT)
         
   
         list_frame = Frame(window)
@@ -59,18 +84,32 @@ class DuplicateHandler:
         scrollbar = Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscroll=scrollbar.set)
         scrollbar.pack(side=RIGHT, fill=Y)
+        # Any manual selection replaces a group-wide "all but first" selection
+        self.tree.bind('<ButtonRelease-1>', self._clear_bulk_selection)
+        self.tree.bind('<KeyRelease>', self._clear_bulk_selection)
+        
+        page_frame = Frame(window)
+        page_frame.pack(fill=X, padx=10)
+        self.page_label_var = StringVar()
+        Button(page_frame, text="◀ Page", command=self.prev_page).pack(side=LEFT)
+        Label(page_frame, textvariable=self.page_label_var).pack(side=LEFT, padx=10)
+        Button(page_frame, text="Page ▶", command=self.next_page).pack(side=LEFT)
         
         actions_frame = Frame(window)
         actions_frame.pack(fill=X, padx=10, pady=10)
         
         Button(actions_frame, text="Delete Selected (Recycle Bin)", 
                command=self.delete_selected).pack(side=LEFT, padx=5)
+        Button(actions_frame, text="Link Selected", 
+               command=self.link_selected).pack(side=LEFT, padx=5)
         Button(actions_frame, text="Move Selected...", 
                command=self.move_selected).pack(side=LEFT, padx=5)
         Button(actions_frame, text="Keep Both (Skip)", 
                command=self.keep_both).pack(side=LEFT, padx=5)
         Button(actions_frame, text="Select All But First", 
                command=self.select_all_but_first).pack(side=LEFT, padx=5)
+        Button(actions_frame, text="Auto Resolve...", 
+               command=self.open_auto_resolve).pack(side=LEFT, padx=5)
         
         # Navigation
         nav_frame = Frame(window)
@@ -85,19 +124,56 @@ class DuplicateHandler:
         self.refresh_group_view()
     
     def refresh_group_view(self):
+        """Render only the current page of the current group"""
         groups = self.duplicate_finder.get_duplicate_groups()
         total = len(groups)
         idx = self.current_group_index + 1
-        self.group_label_var.set(f"Group {idx} of {total} (same content)")
+        summary = self.duplicate_finder.group_summary(self.current_group_index)
+        self.group_label_var.set(
+            f"Group {idx} of {total} (same content, "
+            f"{self.resolver.format_size(summary['wasted'])} reclaimable)")
         
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        if self._rendered_index != self.current_group_index:
+            self.page = 0
+            self._select_all_but_first = False
+            self._rendered_index = self.current_group_index
         
         current_paths = groups[self.current_group_index]
-        for i, path in enumerate(current_paths, start=1):
-            self.tree.insert('', END, values=(i, path))
+        pages = max(1, -(-len(current_paths) // self.PAGE_SIZE))
+        self.page = min(self.page, pages - 1)
+        start = self.page * self.PAGE_SIZE
+        end = min(start + self.PAGE_SIZE, len(current_paths))
+        self.page_label_var.set(
+            f"Files {start + 1}–{end} of {len(current_paths)} (page {self.page + 1} of {pages})")
+        
+        self.tree.delete(*self.tree.get_children())
+        for i in range(start, end):
+            item = self.tree.insert('', END, values=(i + 1, current_paths[i]))
+            if self._select_all_but_first and i > 0:
+                self.tree.selection_add(item)
+    
+    def prev_page(self):
+        if not self._idle():
+            return
+        if self.page > 0:
+            self.page -= 1
+            self.refresh_group_view()
+    
+    def next_page(self):
+        if not self._idle():
+            return
+        groups = self.duplicate_finder.get_duplicate_groups()
+        if (self.page + 1) * self.PAGE_SIZE < len(groups[self.current_group_index]):
+            self.page += 1
+            self.refresh_group_view()
+    
+    def _clear_bulk_selection(self, event=None):
+        self._select_all_but_first = False
     
     def get_selected_paths(self):
+        if self._select_all_but_first:
+            groups = self.duplicate_finder.get_duplicate_groups()
+            return list(groups[self.current_group_index][1:])
         selected = []
         for item in self.tree.selection():
             vals = self.tree.item(item, 'values')
@@ -106,10 +182,14 @@ class DuplicateHandler:
         return selected
     
     def select_all_but_first(self):
+        """Select every file of the group except the first, across all pages"""
+        self._select_all_but_first = True
         self.tree.selection_remove(self.tree.selection())
         items = self.tree.get_children()
-        for item in items[1:]:
-            self.tree.selection_add(item)
+        if self.page > 0:
+            self.tree.selection_add(items)
+        else:
+            self.tree.selection_add(items[1:])
     
     def delete_selected(self):
         groups = self.duplicate_finder.get_duplicate_groups()
@@ -119,78 +199,132 @@ class DuplicateHandler:
         if not selected:
             messagebox.showwarning("Delete", "No files selected.")
             return
+        group_number = self.current_group_index
+        
+        def done(result):
+            self.append_log({
+                "timestamp": time.time(),
+                "group_index": group_number,
+                "action": "delete",
+                "selected_raw": selected,
+                "deleted": result.deleted,
+                "missing": result.missing,
+                "errors": result.errors,
+                "fallback": result.fallback,
+                "group": current_paths
+            })
+            if not self._review_open():
+                return
+            
+            if result.errors:
+                err_text = "\n".join([f"{p}: {msg}" for p, msg in result.errors])
+                messagebox.showerror("Delete Error", 
+                    f"Some files could not be moved to Recycle Bin:\n{err_text}")
+            
+            self.current_group_index = group_number
+            self._update_after_action(result.deleted, result.missing)
         
-        deleted, missing, errors = self._safe_delete_files(selected)
-        
-        self.append_log({
-            "timestamp": time.time(),
-            "group_index": self.current_group_index,
-            "action": "delete",
-            "selected_raw": selected,
-            "deleted": deleted,
-            "missing": missing,
-            "errors": errors,
-            "group": current_paths
-        })
-        
-        if errors:
-            err_text = "\n".join([f"{p}: {msg}" for p, msg in errors])
-            messagebox.showerror("Delete Error", 
-                f"Some files could not be moved to Recycle Bin:\n{err_text}")
-        
-        self._update_after_action(deleted, missing)
+        self._run_in_background(lambda: self._safe_delete_files(selected), done,
+                                f"Deleting {len(selected)} file(s)...")
     
-    def _safe_delete_files(self, file_paths):
-        deleted = []
-        missing = []
-        errors = []
+    def _review_open(self):
+        return self.dup_window is not None and self.dup_window.winfo_exists()
+    
+    def _idle(self):
+        """False, after telling the user, while a background operation runs"""
+        if self.busy:
+            messagebox.showinfo("Duplicates", "Another operation is still running.")
+            return False
+        return True
+    
+    def _run_in_background(self, work, on_done, message):
+        """Run work() on a worker thread and pass its result to on_done on the Tk thread.
         
-        for raw_path in file_paths:
-            path = self._normalize_path(raw_path)
-            
+        Only one operation runs at a time; its caller's group is restored
+        before on_done updates the view.
+        """
+        if not self._idle():
+            return
+        self.busy = True
+        self.group_label_var.set(message)
+        results = queue.Queue()
+        
+        def worker():
             try:
-                if not os.path.exists(path):
-                    missing.append(path)
-                    continue
-                
-                try:
-                    send2trash(path)
-                    deleted.append(path)
-                except Exception as e:
-                    try:
-                        fallback_dir = os.path.join(self.directory, "Duplicates_Trash")
-                        os.makedirs(fallback_dir, exist_ok=True)
-                        dest = self._get_unique_path(fallback_dir, os.path.basename(path))
-                        shutil.move(path, dest)
-                        deleted.append(path)
-                    except Exception as e_move:
-                        errors.append((path, f"fallback move error: {e_move}"))
+                results.put((work(), None))
             except Exception as e:
-                errors.append((raw_path, str(e)))
+                results.put((None, e))
         
-        return deleted, missing, errors
+        def poll():
+            try:
+                result, error = results.get_nowait()
+            except queue.Empty:
+                self.root.after(self.WORK_POLL_MS, poll)
+                return
+            self.busy = False
+            if error is not None:
+                messagebox.showerror("Duplicates", f"Operation failed: {error}")
+                if self._review_open():
+                    self.refresh_group_view()
+                return
+            on_done(result)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(self.WORK_POLL_MS, poll)
+    
+    def _safe_delete_files(self, file_paths):
+        """Trash files in parallel batches; returns a DeleteResult"""
+        return self.delete_executor.execute(file_paths)
     
     def _normalize_path(self, path):
-        if not path:
-            return path
-        path = str(path)
-        if path.startswith('\\\\?\\'):
-            path = path[4:]
-        return os.path.abspath(os.path.normpath(path))
+        return DeleteExecutor.normalize_path(path)
     
-    def _get_unique_path(self, directory, filename):
-        dest = os.path.join(directory, filename)
-        if not os.path.exists(dest):
-            return dest
-        
-        base, ext = os.path.splitext(filename)
-        i = 1
-        while os.path.exists(dest):
-            dest = os.path.join(directory, f"{base}({i}){ext}")
-            i += 1
-        return dest
+    def link_selected(self):
+        """Replace the selected copies with links to the first unselected file"""
+        groups = self.duplicate_finder.get_duplicate_groups()
+        current_paths = list(groups[self.current_group_index])
+        selected = self.get_selected_paths()
+        
+        if not selected:
+            messagebox.showwarning("Link", "No files selected.")
+            return
+        
+        chosen = set(selected)
+        unselected = [p for p in current_paths if p not in chosen]
+        if not unselected:
+            messagebox.showwarning("Link", "Leave at least one file unselected to link to.")
+            return
+        keep = unselected[0]
+        group_number = self.current_group_index
+        
+        def done(result):
+            linked, errors, reclaimed = result
+            self.append_log({
+                "timestamp": time.time(),
+                "group_index": group_number,
+                "action": "link",
+                "keep": keep,
+                "linked": linked,
+                "errors": errors,
+                "bytes_reclaimed": reclaimed,
+                "group": current_paths
+            })
+            if not self._review_open():
+                return
+            
+            if errors:
+                err_text = "\n".join([f"{p}: {msg}" for p, msg in errors])
+                messagebox.showerror("Link Error", f"Some files could not be linked:\n{err_text}")
+            
+            self.current_group_index = group_number
+            self._update_after_action(linked, [])
+        
+        self._run_in_background(lambda: self.linker.link_group(keep, selected), done,
+                                f"Linking {len(selected)} file(s)...")
     
     def move_selected(self):
+        if not self._idle():
+            return
         groups = self.duplicate_finder.get_duplicate_groups()
         current_paths = list(groups[self.current_group_index])
         selected = self.get_selected_paths()
@@ -224,6 +358,8 @@ class DuplicateHandler:
         self._update_after_action(selected, [])
     
     def keep_both(self):
+        if not self._idle():
+            return
         groups = self.duplicate_finder.get_duplicate_groups()
         current_paths = list(groups[self.current_group_index])
         
@@ -242,12 +378,15 @@ class DuplicateHandler:
             self.dup_window.destroy()
     
     def prev_group(self):
+        if not self._idle():
+            return
         if self.current_group_index > 0:
             self.current_group_index -= 1
             self.refresh_group_view()
     
     def next_group(self):
-      
+        if not self._idle():
+            return
         groups = self.duplicate_finder.get_duplicate_groups()
         if self.current_group_index < len(groups) - 1:
             self.current_group_index += 1
@@ -255,18 +394,219 @@ class DuplicateHandler:
         else:
             messagebox.showinfo("Review", "Reached last group.")
     
+    def open_overview(self, top_k=500):
+        """Sortable table of the groups with the most reclaimable space"""
+        finder = self.duplicate_finder
+        win = Toplevel(self.dup_window)
+        win.title("Duplicate Groups Overview")
+        win.geometry("700x450")
+        
+        total = len(finder.get_duplicate_groups())
+        Label(win, text=f"Top {min(top_k, total)} of {total} groups by reclaimable space "
+                        f"({self.resolver.format_size(finder.total_wasted())} in total)",
+              font=("Arial", 10, "bold")).pack(anchor=W, padx=10, pady=10)
+        
+        list_frame = Frame(win)
+        list_frame.pack(fill=BOTH, expand=True, padx=10)
+        
+        columns = ("Group", "Files", "File Size", "Reclaimable")
+        tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        for col in columns:
+            tree.heading(col, text=col, command=lambda c=col: sort_by(c))
+            tree.column(col, width=150, anchor=CENTER)
+        tree.pack(fill=BOTH, expand=True, side=LEFT)
+        scrollbar = Scrollbar(list_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        
+        rows = finder.top_groups(top_k)
+        sort_keys = {"Group": "index", "Files": "count", "File Size": "size", "Reclaimable": "wasted"}
+        sort_state = {"column": "Reclaimable", "reverse": True}
+        
+        def fill():
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert('', END, iid=str(row["index"]), values=(
+                    row["index"] + 1, row["count"],
+                    self.resolver.format_size(row["size"]),
+                    self.resolver.format_size(row["wasted"])))
+        
+        def sort_by(column):
+            reverse = not sort_state["reverse"] if sort_state["column"] == column else True
+            sort_state.update(column=column, reverse=reverse)
+            rows.sort(key=lambda r: r[sort_keys[column]], reverse=reverse)
+            fill()
+        
+        def open_group(event=None):
+            sel = tree.selection()
+            if not sel or not self._idle():
+                return
+            groups = finder.get_duplicate_groups()
+            if not groups:
+                return
+            self.current_group_index = min(int(sel[0]), len(groups) - 1)
+            self.refresh_group_view()
+            win.destroy()
+        
+        tree.bind('<Double-Button-1>', open_group)
+        Button(win, text="Review Selected Group", command=open_group).pack(pady=10)
+        fill()
+    
+    def open_auto_resolve(self):
+        """Dialog to resolve every group with one keep policy"""
+        win = Toplevel(self.dup_window)
+        win.title("Auto Resolve Duplicates")
+        win.geometry("520x400")
+        
+        Label(win, text="Keep one file per group and remove or link the rest",
+              font=("Arial", 10, "bold")).pack(anchor=W, padx=10, pady=(10, 5))
+        
+        policy_var = StringVar(value='oldest')
+        for key, label in DuplicateResolver.POLICIES.items():
+            Radiobutton(win, text=label, variable=policy_var, value=key).pack(anchor=W, padx=20)
+        
+        Label(win, text="Other copies:").pack(anchor=W, padx=10, pady=(8, 0))
+        action_var = StringVar(value='delete')
+        Radiobutton(win, text="Move to Recycle Bin", variable=action_var,
+                    value='delete').pack(anchor=W, padx=20)
+        Radiobutton(win, text="Replace with links to the kept file (reclaims space at once)",
+                    variable=action_var, value='link').pack(anchor=W, padx=20)
+        
+        prefix_frame = Frame(win)
+        prefix_frame.pack(fill=X, padx=20, pady=5)
+        Label(prefix_frame, text="Preferred folder:").pack(side=LEFT)
+        prefix_var = StringVar(value=self.directory or "")
+        Entry(prefix_frame, textvariable=prefix_var).pack(side=LEFT, fill=X, expand=True, padx=5)
+        Button(prefix_frame, text="Browse...", command=lambda: prefix_var.set(
+            filedialog.askdirectory(parent=win, initialdir=self.directory) or prefix_var.get()
+        )).pack(side=LEFT)
+        
+        summary_var = StringVar(value="Run a dry run to see what would be removed.")
+        Label(win, textvariable=summary_var, wraplength=480, justify=LEFT,
+              fg="#2E7D32").pack(anchor=W, padx=10, pady=10)
+        
+        planned = {}  # the last plan, reused while its inputs are unchanged
+        
+        def with_plan(then):
+            """Call then(plan, summary), planning off the Tk thread if needed"""
+            key = (policy_var.get(), prefix_var.get(), self.groups_version)
+            if planned.get('key') == key:
+                then(*planned['result'])
+                return
+            groups = self.duplicate_finder.get_duplicate_groups()
+            label = self.group_label_var.get()
+            
+            def done(result):
+                self.group_label_var.set(label)
+                planned.update(key=key, result=result)
+                if win.winfo_exists():
+                    then(*result)
+            
+            # Planning stats every file of every group
+            self._run_in_background(lambda: self.resolver.plan(groups, key[0], key[1]), done,
+                                    "Planning auto resolve...")
+        
+        def show_dry_run(plan, summary):
+            summary_var.set("Dry run: " + self.resolver.describe(summary))
+        
+        def confirm_apply(plan, summary):
+            if not plan:
+                summary_var.set("Nothing to resolve with this policy.")
+                return
+            if not messagebox.askyesno("Auto Resolve",
+                    self.resolver.describe(summary) + "\n\nProceed?", parent=win):
+                return
+            win.destroy()
+            self.apply_resolution(plan, summary, policy_var.get(), prefix_var.get(),
+                                  action_var.get())
+        
+        button_frame = Frame(win)
+        button_frame.pack(pady=10)
+        Button(button_frame, text="Dry Run",
+               command=lambda: with_plan(show_dry_run)).pack(side=LEFT, padx=5)
+        Button(button_frame, text="Apply to All Groups",
+               command=lambda: with_plan(confirm_apply)).pack(side=LEFT, padx=5)
+        Button(button_frame, text="Cancel", command=win.destroy).pack(side=LEFT, padx=5)
+    
+    def apply_resolution(self, plan, summary, policy, prefix=None, action='delete'):
+        def work():
+            if action == 'link':
+                linked, errors, reclaimed = self.linker.link_many(plan)
+                return linked, [], errors, reclaimed
+            to_remove = [p for _, remove in plan for p in remove]
+            result = self._safe_delete_files(to_remove)
+            # Only what was actually trashed counts; the executor reports normalized paths
+            sizes = self.duplicate_finder.file_sizes
+            size_of = {self._normalize_path(p): sizes.get(p, 0) for p in to_remove}
+            reclaimed = sum(size_of.get(p, 0) for p in result.deleted)
+            return result.deleted, result.missing, result.errors, reclaimed
+        
+        self._run_in_background(
+            work, lambda result: self._finish_resolution(plan, policy, prefix, action, *result),
+            f"Resolving {summary['files']} file(s) in {summary['groups']} group(s)...")
+    
+    def _finish_resolution(self, plan, policy, prefix, action, deleted, missing, errors, reclaimed):
+        # One log entry for the whole batch
+        self.append_log({
+            "timestamp": time.time(),
+            "action": "auto_resolve",
+            "mode": action,
+            "policy": policy,
+            "prefix": prefix if policy == 'prefer_prefix' else None,
+            "bytes_reclaimed": reclaimed,
+            "resolutions": [{"keep": keep, "remove": remove} for keep, remove in plan],
+            "deleted": deleted,
+            "missing": missing,
+            "errors": errors
+        })
+        if not self._review_open():
+            return
+        
+        if errors:
+            messagebox.showerror("Auto Resolve",
+                f"{len(errors)} file(s) could not be processed, e.g.:\n{errors[0][0]}: {errors[0][1]}")
+        
+        gone = {self._normalize_path(p) for p in deleted + missing}
+        self.groups_version += 1
+        groups = self.duplicate_finder.get_duplicate_groups()
+        groups[:] = [g for g in (
+            [p for p in paths if self._normalize_path(p) not in gone] for paths in groups
+        ) if len(g) > 1]
+        self.current_group_index = 0
+        self._rendered_index = None
+        
+        resolved = f"Resolved {len(deleted)} file(s), {self.resolver.format_size(reclaimed)} reclaimed."
+        if not groups:
+            messagebox.showinfo("Duplicates", f"{resolved} No more duplicate groups.")
+            self.dup_window.destroy()
+            return
+        
+        messagebox.showinfo("Duplicates", resolved)
+        self.refresh_group_view()
+    
+    def _current_group_index(self):
+        """GroupIndex of the current group, rebuilt only when the group list changes"""
+        groups = self.duplicate_finder.get_duplicate_groups()
+        current_paths = groups[self.current_group_index]
+        if self.group_index is None or self.group_index.paths is not current_paths:
+            self.group_index = GroupIndex(current_paths, self._normalize_path)
+        return self.group_index
+    
     def _update_after_action(self, deleted, missing):
        
+        self.groups_version += 1
         groups = self.duplicate_finder.get_duplicate_groups()
-        current_paths = groups[self.current_group_index]
-        
-        remaining = [p for p in current_paths if p not in deleted and p not in missing]
-        groups[self.current_group_index] = remaining
+        index = self._current_group_index()
+        index.remove(deleted)
+        index.remove(missing)
+        remaining = index.paths
+        self._select_all_but_first = False
         
         if len(remaining) <= 1:
             del groups[self.current_group_index]
             if self.current_group_index >= len(groups):
                 self.current_group_index = max(0, len(groups) - 1)
+            self._rendered_index = None
         
         if not groups:
             messagebox.showinfo("Duplicates", "No more duplicate groups.")
@@ -276,18 +616,5 @@ class DuplicateHandler:
         self.refresh_group_view()
     
     def append_log(self, entry):
-        data = []
-        if self.log_path and os.path.exists(self.log_path):
-            try:
-                with open(self.log_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except Exception:
-                data = []
-        
-        data.append(entry)
-        
-        try:
-            with open(self.log_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-        except Exception:
-            pass
\ No newline at end of file
+        if self.event_log is not None:
+            self.event_log.append(entry)
@@ -0,0 +1,78 @@
+import os
+
+class DuplicateResolver:
+    """Decide which copy to keep in every duplicate group at once"""
+
+    POLICIES = {
+        'oldest': "Keep oldest file",
+        'newest': "Keep newest file",
+        'shortest_path': "Keep shortest path",
+        'prefer_prefix': "Keep file under preferred folder",
+    }
+
+    def stat_group(self, paths):
+        infos = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            infos.append((path, st.st_mtime, st.st_size))
+        return infos
+
+    def choose_keep(self, infos, policy, prefix=None):
+        """Return the path to keep, or None to leave the group alone"""
+        if policy == 'oldest':
+            return min(infos, key=lambda i: (i[1], len(i[0]), i[0]))[0]
+        if policy == 'newest':
+            return max(infos, key=lambda i: (i[1], -len(i[0])))[0]
+        if policy == 'shortest_path':
+            return min(infos, key=lambda i: (len(i[0]), i[0]))[0]
+        if policy == 'prefer_prefix':
+            if not prefix:
+                return None
+            prefix = os.path.normcase(os.path.abspath(prefix)).rstrip(os.sep) + os.sep
+            preferred = [i for i in infos if os.path.normcase(os.path.abspath(i[0])).startswith(prefix)]
+            if not preferred:
+                return None
+            return min(preferred, key=lambda i: (i[1], len(i[0]), i[0]))[0]
+        raise ValueError(f"Unknown policy: {policy}")
+
+    def plan(self, groups, policy, prefix=None):
+        """Build a resolution plan without touching any file.
+
+        Returns (plan, summary) where plan is a list of (keep, [paths to remove])
+        and summary counts groups, files and reclaimable bytes.
+        """
+        plan = []
+        summary = {"groups": 0, "files": 0, "bytes": 0, "skipped": 0}
+        for paths in groups:
+            infos = self.stat_group(paths)
+            if len(infos) < 2:
+                summary["skipped"] += 1
+                continue
+            keep = self.choose_keep(infos, policy, prefix)
+            if keep is None:
+                summary["skipped"] += 1
+                continue
+            remove = [p for p, _, _ in infos if p != keep]
+            plan.append((keep, remove))
+            summary["groups"] += 1
+            summary["files"] += len(remove)
+            summary["bytes"] += sum(size for p, _, size in infos if p != keep)
+        return plan, summary
+
+    @staticmethod
+    def format_size(size):
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} PB"
+
+    def describe(self, summary):
+        text = (f"{summary['groups']} group(s): {summary['files']} file(s) to remove, "
+                f"{self.format_size(summary['bytes'])} reclaimed")
+        if summary['skipped']:
+            text += f" ({summary['skipped']} group(s) skipped)"
+        return text
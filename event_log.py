@@ -0,0 +1,136 @@
+import os
+import json
+import threading
+
+class EventLog:
+    """Append-only JSON-lines log with size-based rotation.
+
+    Writing an entry is a single append, however long the log already is.
+    Rotated files are kept as log.jsonl.1 (newest) .. log.jsonl.N (oldest).
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = threading.Lock()
+
+    def append(self, entry):
+        self.extend([entry])
+
+    def extend(self, entries):
+        """Append several entries with one write"""
+        data = ''.join(json.dumps(e) + '\n' for e in entries)
+        if not data:
+            return
+        with self.lock:
+            try:
+                self._rotate_if_needed(len(data))
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+            except OSError:
+                pass
+
+    def _rotate_if_needed(self, incoming):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def iter_entries(self):
+        """Stream entries oldest first, across rotated files"""
+        paths = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)]
+        paths.append(self.path)
+        for path in paths:
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except OSError:
+                continue
+            with f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    @staticmethod
+    def iter_json_array(path, chunk_size=64 * 1024):
+        """Stream the items of a (possibly huge) JSON array file one at a time"""
+        decoder = json.JSONDecoder()
+        with open(path, 'r', encoding='utf-8') as f:
+            buf = ''
+            started = False
+            eof = False
+            while True:
+                if not eof and len(buf) < chunk_size:
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buf += chunk
+                buf = buf.lstrip()
+                if not started:
+                    if not buf:
+                        return
+                    if buf[0] != '[':
+                        raise ValueError("Not a JSON array")
+                    buf = buf[1:]
+                    started = True
+                    continue
+                if buf.startswith(','):
+                    buf = buf[1:]
+                    continue
+                if buf.startswith(']') or (eof and not buf):
+                    return
+                try:
+                    item, end = decoder.raw_decode(buf)
+                    complete = eof or end < len(buf)
+                except ValueError:
+                    if eof:
+                        raise
+                    complete = False
+                if not complete:
+                    # Item may span the chunk boundary; read more and retry
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buf += chunk
+                    continue
+                yield item
+                buf = buf[end:]
+
+    def import_legacy(self, json_path):
+        """Convert an old JSON-array log into this log and retire the old file.
+
+        Returns the number of entries converted.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            # Validate in a first streaming pass so a corrupt file imports nothing
+            for _ in self.iter_json_array(json_path):
+                pass
+        except (OSError, ValueError):
+            return 0
+        count = 0
+        batch = []
+        for entry in self.iter_json_array(json_path):
+            batch.append(entry)
+            if len(batch) >= 1000:
+                self.extend(batch)
+                count += len(batch)
+                batch = []
+        self.extend(batch)
+        count += len(batch)
+        try:
+            os.replace(json_path, json_path + '.migrated')
+        except OSError:
+            pass
+        return count
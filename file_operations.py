@@ -1,13 +1,31 @@
 import os
+import json
+import time
 import shutil
+import queue
+import hashlib
+import threading
 from tkinter import filedialog
+from undo_journal import UndoJournal, JOURNAL_NAME
+
+MANIFEST_NAME = '.organizer_manifest.json'
+# Where duplicates the Recycle Bin refuses are moved; never organized back out
+TRASH_FOLDER = 'Duplicates_Trash'
 
 class FileOperations:
   
+    PLAN_BUFFER_SIZE = 1000
+    UNDO_POLL_MS = 100
+    # Files the app itself keeps at the top of a directory; never organized
+    METADATA_FILES = {'.organizer_config.json', MANIFEST_NAME, JOURNAL_NAME}
+    METADATA_PREFIXES = ('duplicates_log.',)
+    
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.directory = None
-        self.undo_data = []
+        self.recursive = False
+        self.incremental = True
+        self.undo_running = False
     
     def select_directory(self):
         self.directory = filedialog.askdirectory()
@@ -16,54 +34,320 @@ class FileOperations:
     def get_directory(self):
   
         return self.directory
+    
+    def is_metadata_file(self, name):
+        return name in self.METADATA_FILES or name.startswith(self.METADATA_PREFIXES)
+    
+    def get_journal(self):
+        return UndoJournal(self.directory)
+    
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+    
+    def config_fingerprint(self, recursive):
+        cfg = json.dumps(self.config_manager.get_config(), sort_keys=True)
+        return hashlib.sha1(f"{cfg}|{recursive}".encode('utf-8')).hexdigest()
+    
+    def load_manifest(self, recursive):
+        """Per-directory records from the last run, or {} if stale or missing.
+        
+        Each record holds the directory mtime after that run, its subdirectories
+        and the identities (size, mtime) of files deliberately left in place.
+        """
+        try:
+            with open(self.manifest_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != 1 or data.get('config') != self.config_fingerprint(recursive):
+            return {}
+        return data.get('dirs', {})
+    
+    def save_manifest(self, dirs, recursive):
+        """Rewrite the manifest in place.
+        
+        Unlike a temp file and rename, rewriting an existing file leaves the
+        root's mtime alone, so the root's own record stays valid; a torn write
+        only costs a full rescan.
+        """
+        data = {
+            "version": 1,
+            "config": self.config_fingerprint(recursive),
+            "last_run": time.time(),
+            "dirs": dirs
+        }
+        try:
+            with open(self.manifest_path(), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+    
+    def iter_file_entries(self, recursive=None, previous=None, scanned=None):
+        """Stream (entry, rel_path) for files to organize using scandir.
+        
+        In recursive mode subdirectories are walked depth-first, except the
+        category output folders and the duplicates trash at the top of the
+        directory. With a previous
+        manifest, directories whose mtime is unchanged are not listed at all
+        and known kept files are skipped; new records are written to scanned.
+        A directory's mtime is read before it is listed, so a file that lands
+        in it while the scan runs leaves the record stale and the directory is
+        listed again next run (_refresh_watermarks keeps that true). When a
+        rule tests size or age, its verdict can change for a file nobody
+        touched, so every directory is listed and every file re-classified.
+        """
+        if recursive is None:
+            recursive = self.recursive
+        previous = previous or {}
+        skip_dirs = {os.path.join(self.directory, f)
+                     for f in self.config_manager.output_folders() | {TRASH_FOLDER}}
+        recheck = self.config_manager.rule_engine.uses_stat()
+        stack = [(self.directory, '')]
+        
+        while stack:
+            current, rel_dir = stack.pop()
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            
+            prev = previous.get(rel_dir)
+            if prev and prev.get('mtime_ns') == mtime_ns and not recheck:
+                # Nothing was added, removed or renamed here since the last run
+                if scanned is not None:
+                    scanned[rel_dir] = prev
+                if recursive:
+                    for name in prev.get('subdirs', []):
+                        path = os.path.join(current, name)
+                        if path not in skip_dirs:
+                            stack.append((path, rel_dir + '/' + name if rel_dir else name))
+                continue
+            
+            record = {"mtime_ns": mtime_ns, "subdirs": [], "kept": {}}
+            if scanned is not None:
+                scanned[rel_dir] = record
+            known = prev.get('kept', {}) if prev and not recheck else {}
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    rel_path = entry.name if not rel_dir else rel_dir + '/' + entry.name
+                    try:
+                        if entry.is_file():
+                            if not rel_dir and self.is_metadata_file(entry.name):
+                                continue
+                            if entry.name in known:
+                                st = entry.stat()
+                                identity = [st.st_size, st.st_mtime_ns]
+                                if known[entry.name] == identity:
+                                    record['kept'][entry.name] = identity
+                                    continue
+                            yield entry, rel_path
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            if entry.path not in skip_dirs:
+                                record['subdirs'].append(entry.name)
+                                stack.append((entry.path, rel_path))
+                    except OSError:
+                        continue
+    
+    def iter_classified_files(self, recursive=None, previous=None, scanned=None):
+        """Yield (entry, rel_path, category) in bounded batches as the tree is scanned"""
+        batch = []
+        for item in self.iter_file_entries(recursive, previous, scanned):
+            batch.append(item)
+            if len(batch) >= self.PLAN_BUFFER_SIZE:
+                yield from self._classify_batch(batch)
+                batch = []
+        if batch:
+            yield from self._classify_batch(batch)
+    
+    def _classify_batch(self, batch):
+        results = self.config_manager.classify_entries(batch)
+        for (entry, rel_path), (_, category) in zip(batch, results):
+            yield entry, rel_path, category
+    
     def get_file_preview_list(self):
         """Get list of files to be organized with their categories"""
         if not self.directory:
             return []
         
-        file_list = []
-        
-        for filename in os.listdir(self.directory):
-            file_path = os.path.join(self.directory, filename)
-            
-            if os.path.isfile(file_path):
-                file_extension = os.path.splitext(filename)[1]
-                category = self.config_manager.ext_to_category(file_extension)
-                file_list.append((file_path, category))
-        
-        return file_list
+        self.config_manager.rule_engine.start_run()
+        previous = self.load_manifest(self.recursive) if self.incremental else None
+        return [
+            (entry.path, category)
+            for entry, _, category in self.iter_classified_files(previous=previous)
+            if category is not None
+        ]
     
     def organize_files(self, preview=False):
         """Organize files, optionally with preview"""
         if not self.directory:
             return "Please select a directory first."
         
-        self.undo_data = []
-        config = self.config_manager.get_config()
+        rule_engine = self.config_manager.rule_engine
+        rule_engine.start_run()
+        recursive = self.recursive
+        previous = self.load_manifest(recursive) if self.incremental else None
+        scanned = {}
+        touched = set()
         
-        for filename in os.listdir(self.directory):
-            file_path = os.path.join(self.directory, filename)
-            
-            if os.path.isfile(file_path):
-                file_extension = os.path.splitext(filename)[1]
-                category = self.config_manager.ext_to_category(file_extension)
-                destination = os.path.join(self.directory, category)
-                
-                if not os.path.exists(destination):
-                    os.makedirs(destination)
-                
-                self.undo_data.append((file_path, destination))
-                shutil.move(file_path, destination)
+        # Moves are applied one plan batch at a time while the scan continues;
+        # they only add entries to the output folders, which are never scanned.
+        journal = self.get_journal()
+        journal.begin_run()
+        try:
+            plan = []
+            for entry, rel_path, category in self.iter_classified_files(recursive, previous, scanned):
+                rel_dir = rel_path.rpartition('/')[0]
+                if category is None:
+                    try:
+                        st = entry.stat()
+                        scanned[rel_dir]['kept'][entry.name] = [st.st_size, st.st_mtime_ns]
+                    except OSError:
+                        pass
+                    continue
+                touched.add(rel_dir)
+                plan.append((entry.path, category))
+                if len(plan) >= self.PLAN_BUFFER_SIZE:
+                    self._execute_plan(plan, journal)
+                    plan = []
+            self._execute_plan(plan, journal)
+        finally:
+            journal.end_run()
+        
+        # The journal and manifest live in the root, and creating either changes
+        # its mtime; make sure both exist before deciding whether to re-stamp it
+        try:
+            open(self.manifest_path(), 'a').close()
+        except OSError:
+            pass
+        root = scanned.get('')
+        if root is not None and root['mtime_ns'] is not None:
+            try:
+                if os.stat(self.directory).st_mtime_ns != root['mtime_ns']:
+                    touched.add('')  # moved out of, output folders or metadata created
+            except OSError:
+                root['mtime_ns'] = None
+        
+        self._refresh_watermarks(scanned, touched, recursive)
+        self.save_manifest(scanned, recursive)
         
+        summary = rule_engine.hit_summary()
+        if summary:
+            return f"Files organized successfully! Rule hits: {summary}"
         return "Files organized successfully!"
     
-    def undo(self):
-        if not self.undo_data:
+    def _refresh_watermarks(self, scanned, touched, recursive):
+        """Re-stamp directories this run moved files out of.
+        
+        A directory is only re-stamped if its listing still matches the record
+        exactly: no new files or subdirectories, and every kept file with the
+        same size and mtime. The mtime is read before re-listing, so anything
+        that appears after the listing leaves the directory marked for a
+        rescan next time.
+        """
+        output_folders = self.config_manager.output_folders()
+        for rel_dir in touched:
+            record = scanned.get(rel_dir)
+            if record is None:
+                continue
+            path = os.path.join(self.directory, rel_dir) if rel_dir else self.directory
+            files = {}
+            dirs = set()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            st = entry.stat()
+                            files[entry.name] = [st.st_size, st.st_mtime_ns]
+                        elif entry.is_dir(follow_symlinks=False):
+                            dirs.add(entry.name)
+            except OSError:
+                record['mtime_ns'] = None
+                continue
+            if not rel_dir:
+                files = {name: identity for name, identity in files.items()
+                         if not self.is_metadata_file(name)}
+                dirs -= output_folders | {TRASH_FOLDER}
+            # A kept name now holding a different file must be looked at again
+            unchanged = all(record['kept'].get(name) == identity for name, identity in files.items())
+            if recursive:
+                unchanged = unchanged and dirs <= set(record['subdirs'])
+            record['mtime_ns'] = mtime_ns if unchanged else None
+    
+    def _execute_plan(self, plan, journal):
+        for file_path, category in plan:
+            destination = os.path.join(self.directory, category)
+            
+            if not os.path.exists(destination):
+                os.makedirs(destination)
+            
+            dest_path = self._get_unique_path(destination, os.path.basename(file_path))
+            # Journal first: a crash between the two leaves a harmless no-op record
+            journal.record_move(file_path, dest_path)
+            shutil.move(file_path, dest_path)
+    
+    def _get_unique_path(self, directory, filename):
+        dest = os.path.join(directory, filename)
+        if not os.path.exists(dest):
+            return dest
+        
+        base, ext = os.path.splitext(filename)
+        i = 1
+        while os.path.exists(dest):
+            dest = os.path.join(directory, f"{base}({i}){ext}")
+            i += 1
+        return dest
+    
+    def undo(self, run_id=None):
+        """Undo a journaled run (the latest one not yet undone by default)"""
+        if not self.directory:
+            return "Please select a directory first."
+        
+        journal = self.get_journal()
+        run_id = run_id or journal.last_undoable_run()
+        if not run_id:
             return "Nothing to undo."
         
-        for file_path, destination in self.undo_data:
-            filename = os.path.basename(file_path)
-            shutil.move(os.path.join(destination, filename), self.directory)
+        restored, missing, errors = journal.undo_run(run_id)
+        if errors:
+            return f"Restored {len(restored)} file(s); {len(errors)} could not be restored. Run undo again to retry."
+        if missing:
+            return f"Partially undone: restored {len(restored)} file(s); {len(missing)} no longer exist."
+        return "Files restored to original state."
+    
+    def undo_in_background(self, widget, on_done, run_id=None):
+        """Run undo on a worker thread and pass its message to on_done on the Tk thread.
+        
+        Polling is scheduled on the root window, so closing widget's window
+        mid-undo does not cancel it. Returns False without starting if an
+        undo is already running.
+        """
+        if self.undo_running:
+            return False
+        self.undo_running = True
+        root = widget.nametowidget('.')
+        results = queue.Queue()
+        
+        def worker():
+            try:
+                results.put(self.undo(run_id))
+            except Exception as e:
+                results.put(f"Undo failed: {e}")
+            finally:
+                self.undo_running = False
+        
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                root.after(self.UNDO_POLL_MS, poll)
+                return
+            on_done(result)
         
-        self.undo_data = []
-        return "Files restored to original state."
\ No newline at end of file
+        threading.Thread(target=worker, daemon=True).start()
+        root.after(self.UNDO_POLL_MS, poll)
+        return True
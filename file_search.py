@@ -1,29 +1,221 @@
 from tkinter import Toplevel, Frame, Label, Entry, Listbox, Button, Scrollbar
-from tkinter import StringVar, END, BOTH, LEFT, RIGHT, Y, W, E
+from tkinter import StringVar, BooleanVar, Checkbutton, Radiobutton, DISABLED, END, BOTH, LEFT, RIGHT, Y, W, E
 import os
 import subprocess
 import platform
+import queue
+import threading
+import sqlite3
+from bisect import bisect_left
+from search_index import TrigramIndex
+from search_database import SearchDatabase
+from content_index import ContentIndex
+from metadata_query import MetadataQuery
+from parallel_scanner import ParallelScanner
+from fuzzy_matcher import FuzzyMatcher
+from config_manager import ConfigManager
 
 class FileSearchWindow:
     
-    def __init__(self, parent, directory):
+    DEBOUNCE_MS = 150
+    MAX_RESULTS = 500
+    SCAN_POLL_MS = 200
+    SCAN_BATCH = 2000
+    
+    def __init__(self, parent, directory, config_manager=None):
         self.parent = parent
         self.directory = directory
+        self.config_manager = config_manager or ConfigManager()
+        categories = self.config_manager.get_config().get('categories', {})
+        self.metadata_query = MetadataQuery(categories)
         self.all_files = []
+        self.texts = []  # lowercased rel paths, by file id
+        self.db = None
+        self.db_ids = []  # database row id of each file id, ascending
+        self.content = None
+        self.content_ready = False
+        self.snippets = {}  # file id -> (line number, text) for content hits
+        self.scanning = True
+        self.scan_running = False
+        self.closed = False
+        self.close_lock = threading.Lock()
+        self.index = TrigramIndex()
+        self.texts = self.index.texts
+        self.matcher = FuzzyMatcher()
+        self.displayed = []  # file ids in listbox order
+        self.last_query = None
+        self.last_ids = None
+        self.last_covered = 0  # files the shown results account for
+        self.search_generation = 0
+        self.shown_generation = 0
+        self.pending_search = None
+        self.polling = False
+        self.results_queue = queue.Queue()
         self.window = Toplevel(parent)
         self.window.title("File Search & Open")
         self.window.geometry("700x500")
-        self.scan_files()
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.open_database()
         self.setup_ui()
+        self.start_scan()
     
-    def scan_files(self):
+    def open_database(self):
         if not self.directory or not os.path.exists(self.directory):
             return
-        for root_dir, _, files in os.walk(self.directory):
-            for filename in files:
-                file_path = os.path.join(root_dir, filename)
-                rel_path = os.path.relpath(file_path, self.directory)
-                self.all_files.append((filename, file_path, rel_path))
+        try:
+            self.db = SearchDatabase(self.directory, self.config_manager)
+        except (sqlite3.Error, OSError):
+            self.db = None
+            return
+        try:
+            self.content = ContentIndex(self.db, self.config_manager)
+        except sqlite3.Error:
+            self.content = None
+    
+    def scan_files(self, put):
+        """Feed ('batch', (row ids or None, entries)) messages to put as files are found"""
+        if self.db is not None:
+            if self.db.is_indexed():
+                for batch in self.db.iter_entries(self.SCAN_BATCH):
+                    put(('batch', batch))
+                # Rows already shown may have changed; swap in the refreshed set wholesale
+                if self.db.refresh(cancelled=lambda: self.closed):
+                    put(('files', self.db.load_entries()))
+            else:
+                self.db.refresh(cancelled=lambda: self.closed,
+                                on_files=lambda batch: put(('batch', batch)))
+            return
+        
+        scanner = ParallelScanner()
+        
+        def visit(rel_dir, path):
+            try:
+                files, subdirs = scanner.list_dir(path)
+            except OSError:
+                return [], []
+            return ([name for name, _ in files],
+                    [os.path.join(rel_dir, name) if rel_dir else name for name in subdirs])
+        
+        batch = []
+        for rel_dir, names in scanner.walk(self.directory, visit, lambda: self.closed):
+            for filename in names:
+                rel_path = os.path.join(rel_dir, filename) if rel_dir else filename
+                batch.append((filename, os.path.join(self.directory, rel_path), rel_path))
+            if len(batch) >= self.SCAN_BATCH:
+                put(('batch', (None, batch)))
+                batch = []
+        if batch:
+            put(('batch', (None, batch)))
+    
+    def start_scan(self):
+        """Populate the window from a background scan, then keep the content index current"""
+        scan_queue = queue.Queue()
+        self.scan_running = True
+        
+        def worker():
+            try:
+                if self.directory and os.path.exists(self.directory):
+                    self.scan_files(scan_queue.put)
+                scan_queue.put(('scanned', None))
+                if self.content is not None and self.content.update(cancelled=lambda: self.closed) is not None:
+                    scan_queue.put(('contents', None))
+            except sqlite3.Error:
+                pass
+            finally:
+                scan_queue.put(('done', None))
+                with self.close_lock:
+                    self.scan_running = False
+                    if self.closed:
+                        self.close_database()
+        
+        def poll():
+            if self.closed or not self.window.winfo_exists():
+                return
+            done = False
+            while True:
+                try:
+                    kind, payload = scan_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'batch':
+                    self.add_entries(*payload)
+                elif kind == 'files':
+                    self.db_ids, self.all_files = payload
+                    self.texts = [rel_path.lower() for _, _, rel_path in self.all_files]
+                    self.on_mode_change()
+                elif kind == 'scanned':
+                    self.scanning = False
+                    # Queries answered by the database are not re-applied per batch
+                    if self.last_query and (self.mode_var.get() == 'contents'
+                                            or self.is_metadata_query(self.last_query)):
+                        self.start_search()
+                elif kind == 'contents':
+                    self.content_ready = True
+                    if self.mode_var.get() == 'contents':
+                        self.on_mode_change()
+                elif kind == 'done':
+                    done = True
+                    self.scanning = False
+            
+            if len(self.all_files) > self.last_covered:
+                self.extend_results()
+            scanning = " (scanning...)" if self.scanning else ""
+            self.total_label.config(text=f"Total files: {len(self.all_files)}{scanning}")
+            if not done:
+                self.window.after(self.SCAN_POLL_MS, poll)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.window.after(self.SCAN_POLL_MS, poll)
+    
+    def add_entries(self, row_ids, entries):
+        if row_ids is not None:
+            self.db_ids.extend(row_ids)
+            self.all_files.extend(entries)
+            self.texts.extend(rel_path.lower() for _, _, rel_path in entries)
+        else:
+            # The trigram index owns the text list in this mode
+            self.all_files.extend(entries)
+            self.index.add(entries)
+    
+    def extend_results(self):
+        """Apply the current query to files that arrived after it was run"""
+        query = self.last_query
+        if query is None or self.pending_search is not None:
+            return
+        if self.search_generation != self.shown_generation:
+            return  # a search is already running; poll_results extends its results
+        if self.mode_var.get() == 'contents' or self.is_metadata_query(query):
+            return  # answered by the database once the scan is done
+        new_ids = range(self.last_covered, len(self.all_files))
+        if self.fuzzy_var.get() and query:
+            matched = self.matcher.filter(query, self.texts, new_ids)
+        else:
+            matched = [i for i in new_ids if query in self.texts[i]]
+        ids = self.last_ids + matched
+        if not query:
+            ranked = ids[:self.MAX_RESULTS]
+        elif matched:
+            # The best of old and new is among the shown top results plus the new matches
+            ranked = self.matcher.top_n(query, self.displayed + matched, self.texts, self.MAX_RESULTS)
+        else:
+            ranked = self.displayed
+        self.show_results(query, ids, ranked)
+        self.last_covered = len(self.all_files)
+    
+    def close(self):
+        self.closed = True
+        self.search_generation += 1
+        self.window.destroy()
+        with self.close_lock:
+            # A running scan closes them itself once it sees the window is gone
+            if not self.scan_running:
+                self.close_database()
+    
+    def close_database(self):
+        if self.content is not None:
+            self.content.close()
+        if self.db is not None:
+            self.db.close()
     
     def setup_ui(self):
     
@@ -33,8 +225,9 @@ class FileSearchWindow:
               font=("Arial", 14, "bold")).pack()
         Label(title_frame, text=f"Searching in: {self.directory}", 
               font=("Arial", 9)).pack()
-        Label(title_frame, text=f"Total files: {len(self.all_files)}", 
-              font=("Arial", 9)).pack()
+        self.total_label = Label(title_frame, text=f"Total files: {len(self.all_files)}", 
+                                 font=("Arial", 9))
+        self.total_label.pack()
       
         search_frame = Frame(self.window)
         search_frame.pack(pady=10, padx=10, fill='x')
@@ -47,6 +240,19 @@ class FileSearchWindow:
         search_entry.pack(side=LEFT, fill='x', expand=True, padx=5)
         search_entry.focus()
         
+        self.fuzzy_var = BooleanVar(value=False)
+        Checkbutton(search_frame, text="Fuzzy", variable=self.fuzzy_var,
+                    command=self.on_mode_change).pack(side=LEFT, padx=5)
+        
+        self.mode_var = StringVar(value='names')
+        Radiobutton(search_frame, text="Names", variable=self.mode_var, value='names',
+                    command=self.on_mode_change).pack(side=LEFT)
+        contents_button = Radiobutton(search_frame, text="Contents", variable=self.mode_var,
+                                      value='contents', command=self.on_mode_change)
+        contents_button.pack(side=LEFT)
+        if self.content is None:
+            contents_button.config(state=DISABLED)
+        
         Button(search_frame, text="Clear", command=self.clear_search,
                font=("Arial", 9)).pack(side=LEFT, padx=5)
         
@@ -84,33 +290,196 @@ class FileSearchWindow:
         Button(button_frame, text="Open Folder", command=self.open_folder,
                bg="#2196F3", fg="white", font=("Arial", 10, "bold"),
                padx=15, pady=5).pack(side=LEFT, padx=5)
-        Button(button_frame, text="Close", command=self.window.destroy,
+        Button(button_frame, text="Close", command=self.close,
                bg="#9E9E9E", fg="white", font=("Arial", 10, "bold"),
                padx=15, pady=5).pack(side=LEFT, padx=5)
         
         self.update_results("")
     
     def on_search_change(self, *args):
-        search_text = self.search_var.get()
-        self.update_results(search_text)
+        # Debounce: only search once typing pauses
+        if self.pending_search is not None:
+            self.window.after_cancel(self.pending_search)
+        self.pending_search = self.window.after(self.DEBOUNCE_MS, self.start_search)
+    
+    def on_mode_change(self):
+        # Previous results were produced by the other matcher; start over
+        self.last_query = None
+        self.last_ids = None
+        self.start_search()
+    
+    def db_search(self, query, candidates=None):
+        """Substring search through the stored index, mapped back to file ids"""
+        db_ids = self.db_ids
+        if not query:
+            return list(candidates) if candidates is not None else list(range(len(db_ids)))
+        ids = []
+        lo = 0
+        # Both sides are ascending, so each lookup starts where the last one ended
+        for row_id in self.db.search(query):
+            lo = bisect_left(db_ids, row_id, lo)
+            if lo == len(db_ids):
+                break
+            if db_ids[lo] == row_id:
+                ids.append(lo)
+        if candidates is not None:
+            allowed = set(candidates)
+            ids = [i for i in ids if i in allowed]
+        return ids
+    
+    def file_id(self, row_id):
+        """File id of a database row, or None if it was added after the rows were loaded"""
+        i = bisect_left(self.db_ids, row_id)
+        if i < len(self.db_ids) and self.db_ids[i] == row_id:
+            return i
+        return None
+    
+    def content_search(self, query):
+        """Ranked file ids whose text matches query, plus their snippets"""
+        ranked = []
+        snippets = {}
+        for row_id, line_no, text in self.content.search(query, self.MAX_RESULTS):
+            i = self.file_id(row_id)
+            if i is not None:
+                ranked.append(i)
+                snippets[i] = (line_no, text)
+        return ranked, snippets
+    
+    def metadata_search(self, query):
+        """File ids matching a size:/ext:/modified:/category: query, via the database indexes"""
+        where, params = self.metadata_query.parse(query)
+        ids = []
+        for row_id in self.db.select(where, params):
+            i = self.file_id(row_id)
+            if i is not None:
+                ids.append(i)
+        return ids
+    
+    def is_metadata_query(self, query):
+        return self.db is not None and MetadataQuery.is_structured(query)
+    
+    def match(self, query, candidates=None, fuzzy=False, cancelled=None, contents=False, limit=None):
+        """All matching ids, the top MAX_RESULTS of them in ranked order, and content snippets.
+        
+        limit drops ids of files that arrived while the search ran; the scan adds them later.
+        """
+        if contents:
+            if not query or self.content is None:
+                return [], [], {}
+            ranked, snippets = self.content_search(query)
+            return ranked, ranked, snippets
+        if self.is_metadata_query(query):
+            ids = self.metadata_search(query)
+            if limit is not None:
+                ids = ids[:bisect_left(ids, limit)]
+            return ids, ids[:self.MAX_RESULTS], None
+        if fuzzy and query:
+            ids = self.matcher.filter(query, self.texts, candidates, cancelled)
+        elif self.db is not None:
+            ids = self.db_search(query, candidates)
+        else:
+            ids = self.index.search(query, candidates, cancelled)
+        if ids is None:
+            return None, None, None
+        if limit is not None:
+            ids = ids[:bisect_left(ids, limit)]
+        if not query:
+            return ids, ids[:self.MAX_RESULTS], None
+        ranked = self.matcher.top_n(query, ids, self.texts, self.MAX_RESULTS, cancelled)
+        return ids, ranked, None
+    
+    def start_search(self):
+        self.pending_search = None
+        query = self.search_var.get().lower()
+        fuzzy = self.fuzzy_var.get()
+        contents = self.mode_var.get() == 'contents'
+        self.search_generation += 1
+        generation = self.search_generation
+        
+        # A longer query can only match a subset of the previous results
+        candidates = None
+        # (not so for field queries: "size:<2" -> "size:<20" widens the range)
+        if (not contents and not self.is_metadata_query(query) and self.last_ids is not None
+                and self.last_query and self.last_query in query):
+            # Files that arrived since the last results were shown are still unchecked
+            candidates = self.last_ids + list(range(self.last_covered, len(self.all_files)))
+        
+        def cancelled():
+            return generation != self.search_generation
+        
+        known = len(self.all_files)
+        
+        def worker():
+            try:
+                ids, ranked, snippets = self.match(query, candidates, fuzzy, cancelled, contents, known)
+            except ValueError as e:
+                # A malformed field query; ids of None tells poll_results to report it
+                self.results_queue.put((generation, query, known, None, None, str(e)))
+                return
+            except sqlite3.Error:
+                return  # the window closed and took the database with it
+            if ranked is not None:
+                self.results_queue.put((generation, query, known, ids, ranked, snippets))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        if not self.polling:
+            self.polling = True
+            self.window.after(20, self.poll_results)
+    
+    def poll_results(self):
+        """Pick up worker results on the Tk thread; stale generations are dropped"""
+        if not self.window.winfo_exists():
+            return
+        while True:
+            try:
+                generation, query, known, ids, ranked, snippets = self.results_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.search_generation:
+                self.polling = False
+                self.shown_generation = generation
+                if ids is None:
+                    self.info_label.config(text=f"Invalid query: {snippets}")
+                else:
+                    self.show_results(query, ids, ranked, snippets)
+                    self.last_covered = known
+                    if len(self.all_files) > known:
+                        self.extend_results()
+                return
+        self.window.after(20, self.poll_results)
     
     def update_results(self, search_text):
-        self.results_listbox.delete(0, END)
+        query = search_text.lower()
+        contents = self.mode_var.get() == 'contents'
+        ids, ranked, snippets = self.match(query, fuzzy=self.fuzzy_var.get(), contents=contents)
+        self.show_results(query, ids, ranked, snippets)
+        self.last_covered = len(self.all_files)
+    
+    def show_results(self, query, ids, ranked, snippets=None):
+        self.last_query = query
+        self.last_ids = ids
+        self.displayed = ranked
+        self.snippets = snippets or {}
         
-        search_text = search_text.lower()
-        matches = []
-        for filename, file_path, rel_path in self.all_files:
-            if search_text in filename.lower() or search_text in rel_path.lower():
-                matches.append((filename, file_path, rel_path))
-       
-        for filename, file_path, rel_path in matches:
-            display_text = f"{filename}  →  {rel_path}"
-            self.results_listbox.insert(END, display_text)
+        # Only the capped, ranked slice ever reaches the widget
+        self.results_listbox.delete(0, END)
+        if snippets is not None:
+            self.results_listbox.insert(END, *[
+                f"{self.all_files[i][2]}:{snippets[i][0]}  {snippets[i][1]}" for i in ranked
+            ])
+        else:
+            self.results_listbox.insert(END, *[
+                f"{self.all_files[i][0]}  →  {self.all_files[i][2]}" for i in ranked
+            ])
         
-        if search_text:
-            self.info_label.config(text=f"Found {len(matches)} file(s) matching '{search_text}'")
+        shown = f" (showing top {len(ranked)})" if len(ranked) < len(ids) else ""
+        if snippets is not None:
+            indexing = "" if self.content_ready else " (still indexing contents)"
+            self.info_label.config(text=f"{len(ranked)} file(s) mention '{query}'{indexing}")
+        elif query:
+            self.info_label.config(text=f"Found {len(ids)} file(s) matching '{query}'{shown}")
         else:
-            self.info_label.config(text=f"Showing all {len(matches)} files")
+            self.info_label.config(text=f"{len(ids)} files{shown}")
     
     def clear_search(self):
         self.search_var.set("")
@@ -120,14 +489,8 @@ class FileSearchWindow:
         if not selection:
             return None
         index = selection[0]
-        search_text = self.search_var.get().lower()
-        matches = []
-        for filename, file_path, rel_path in self.all_files:
-            if search_text in filename.lower() or search_text in rel_path.lower():
-                matches.append(file_path)
-        
-        if index < len(matches):
-            return matches[index]
+        if index < len(self.displayed):
+            return self.all_files[self.displayed[index]][1]
         return None
     
     def on_double_click(self, event):
@@ -7,6 +7,7 @@ from tkinter import *
 from tkinter import filedialog, messagebox, simpledialog
 from tkinter import ttk
 from send2trash import send2trash
+from event_log import EventLog
 
 class FileOrganizer:
     """
@@ -63,8 +64,7 @@ class FileOrganizer:
             for filename in os.listdir(self.directory):
                 file_path = os.path.join(self.directory, filename)
                 if os.path.isfile(file_path):
-                    file_extension = os.path.splitext(filename)[1]
-                    category = self.ext_to_category(file_extension, self.config)
+                    category = self.file_to_category(filename, self.config)
                     destination = os.path.join(self.directory, category)
                     if not os.path.exists(destination):
                         os.makedirs(destination)
@@ -152,12 +152,34 @@ class FileOrganizer:
         self.append_log({"timestamp": time.time(), "action": "config_saved", "target": target})
         return cfg
 
+    def build_ext_index(self, config):
+        # Reverse extension -> folder map; the first category listing an extension wins
+        index = {}
+        for folder, exts in config.get('categories', {}).items():
+            for ext in exts:
+                index.setdefault(ext, folder)
+        self.ext_index = index
+        self.ext_index_config = config
+        self.max_ext_parts = max((ext.count('.') for ext in index), default=1)
+        return index
+
     def ext_to_category(self, ext, config):
+        # Only rebuilt when a different config dict is passed in (load/save replace it)
+        if getattr(self, 'ext_index_config', None) is not config:
+            self.build_ext_index(config)
         ext = self.normalize_extension(ext)
-        for folder, exts in config.get('categories', {}).items():
-            if ext in exts:
+        return self.ext_index.get(ext, config.get('default_folder', 'Others'))
+
+    def file_to_category(self, filename, config):
+        if getattr(self, 'ext_index_config', None) is not config:
+            self.build_ext_index(config)
+        parts = filename.lstrip('.').lower().split('.')
+        # Try compound extensions such as .tar.gz before the plain one
+        for n in range(min(self.max_ext_parts, len(parts) - 1), 1, -1):
+            folder = self.ext_index.get('.' + '.'.join(parts[-n:]))
+            if folder:
                 return folder
-        return config.get('default_folder', 'Others')
+        return self.ext_to_category(os.path.splitext(filename)[1], config)
 
 
     def open_categories_editor(self):
@@ -300,7 +322,8 @@ class FileOrganizer:
             self.status_label.config(text="No duplicates found.")
             return
         self.current_group_index = 0
-        self.log_path = os.path.join(self.directory, 'duplicates_log.json')
+        self.log_path = os.path.join(self.directory, 'duplicates_log.jsonl')
+        EventLog(self.log_path).import_legacy(os.path.join(self.directory, 'duplicates_log.json'))
         self.open_duplicates_window()
 
     def open_duplicates_window(self):
@@ -401,19 +424,11 @@ class FileOrganizer:
             messagebox.showinfo("Review", "Reached last group.")
 
     def append_log(self, entry):
-        data = []
-        if self.log_path and os.path.exists(self.log_path):
-            try:
-                with open(self.log_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except Exception:
-                data = []
-        data.append(entry)
-        try:
-            with open(self.log_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-        except Exception:
-            pass
+        # One O(1) append per entry; the old JSON-array log is converted on first use
+        log_path = getattr(self, 'log_path', None)
+        if not log_path:
+            return
+        EventLog(log_path).append(entry)
 
     def delete_selected(self):
         current_paths = list(self.duplicate_groups[self.current_group_index])
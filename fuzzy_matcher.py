@@ -0,0 +1,105 @@
+import heapq
+
+BOUNDARY_CHARS = '/\\_-. '
+
+class FuzzyMatcher:
+    """fzf-style subsequence matching with ranked scores.
+
+    Scores reward contiguous runs, matches at word boundaries and matches in
+    the file name, and penalise gaps and deep paths. Texts are expected to be
+    lowercased relative paths.
+    """
+
+    SCORE_MATCH = 16
+    BONUS_CONSECUTIVE = 8
+    BONUS_BOUNDARY = 10
+    BONUS_BASENAME = 4
+    PENALTY_GAP = 1
+    PENALTY_DEPTH = 3
+    CHUNK_SIZE = 20000
+
+    def _positions(self, query, text):
+        """Tightest window of a subsequence match, as a list of indices, or None"""
+        # Forward pass finds where the first match ends...
+        pos = -1
+        for ch in query:
+            pos = text.find(ch, pos + 1)
+            if pos < 0:
+                return None
+        # ...a backward pass from there gives the shortest window ending at it
+        positions = [0] * len(query)
+        for k in range(len(query) - 1, -1, -1):
+            pos = text.rfind(query[k], 0, pos + 1 if k == len(query) - 1 else pos)
+            positions[k] = pos
+        return positions
+
+    def score(self, query, text):
+        """Return a score (higher is better) or None when query does not match"""
+        if not query:
+            return 0
+        base = max(text.rfind('/'), text.rfind('\\')) + 1
+        depth = text.count('/') + text.count('\\')
+
+        # Contiguous matches are the common case and the strongest signal
+        pos = text.find(query, base)
+        if pos < 0:
+            pos = text.find(query)
+        if pos >= 0:
+            positions = range(pos, pos + len(query))
+        else:
+            positions = self._positions(query, text)
+            if positions is None:
+                return None
+
+        score = 0
+        prev = None
+        for i in positions:
+            score += self.SCORE_MATCH
+            if i == 0 or text[i - 1] in BOUNDARY_CHARS:
+                score += self.BONUS_BOUNDARY
+            if i >= base:
+                score += self.BONUS_BASENAME
+            if prev is not None:
+                if i == prev + 1:
+                    score += self.BONUS_CONSECUTIVE
+                else:
+                    score -= self.PENALTY_GAP * (i - prev - 1)
+            prev = i
+        return score - self.PENALTY_DEPTH * depth
+
+    def filter(self, query, texts, pool=None, cancelled=None):
+        """Ids (from pool, default all) whose text contains query as a subsequence"""
+        if pool is None:
+            pool = range(len(texts))
+        results = []
+        for start in range(0, len(pool), self.CHUNK_SIZE):
+            if cancelled is not None and cancelled():
+                return None
+            for i in pool[start:start + self.CHUNK_SIZE]:
+                text = texts[i]
+                pos = -1
+                for ch in query:
+                    pos = text.find(ch, pos + 1)
+                    if pos < 0:
+                        break
+                else:
+                    results.append(i)
+        return results
+
+    def top_n(self, query, ids, texts, n, cancelled=None):
+        """The n best-scoring ids, best first; None if cancelled"""
+        heap = []
+        for start in range(0, len(ids), self.CHUNK_SIZE):
+            if cancelled is not None and cancelled():
+                return None
+            for i in ids[start:start + self.CHUNK_SIZE]:
+                s = self.score(query, texts[i])
+                if s is None:
+                    continue
+                # Ties go to the shorter path, then to scan order
+                item = (s, -len(texts[i]), -i)
+                if len(heap) < n:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        return [-i for _, _, i in sorted(heap, reverse=True)]
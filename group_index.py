@@ -0,0 +1,50 @@
+class GroupIndex:
+    """Path positions for one duplicate group, kept valid as paths are removed.
+
+    Paths are normalized once, when the index is built. A removed path's
+    current position is its original one minus the removals before it,
+    counted with a Fenwick tree, so each removal costs O(log n) bookkeeping
+    and one list deletion instead of a pass over the whole group. Large
+    batches are deleted in a single compaction pass.
+    """
+
+    COMPACT_THRESHOLD = 64
+
+    def __init__(self, paths, normalize):
+        self.paths = paths
+        self.normalize = normalize
+        self.positions = {normalize(path): i for i, path in enumerate(paths)}
+        self.tree = [0] * (len(paths) + 1)
+
+    def _removed_before(self, position):
+        count = 0
+        while position > 0:
+            count += self.tree[position]
+            position -= position & -position
+        return count
+
+    def _mark_removed(self, position):
+        position += 1
+        while position < len(self.tree):
+            self.tree[position] += 1
+            position += position & -position
+
+    def remove(self, paths):
+        """Delete paths from the group list in place; returns how many were in it"""
+        originals = []
+        for path in paths:
+            original = self.positions.pop(self.normalize(path), None)
+            if original is not None:
+                originals.append(original)
+        # Positions in the list as it is now, before any of this batch is deleted
+        current = [original - self._removed_before(original) for original in originals]
+        for original in originals:
+            self._mark_removed(original)
+        # Every deletion shifts the tail, so a large batch is one compaction pass instead
+        if len(current) > self.COMPACT_THRESHOLD:
+            gone = set(current)
+            self.paths[:] = [path for i, path in enumerate(self.paths) if i not in gone]
+        else:
+            for position in sorted(current, reverse=True):
+                del self.paths[position]
+        return len(current)
@@ -1,4 +1,4 @@
-from tkinter import Tk, Button, Label, Frame, Menu
+from tkinter import Tk, Button, Label, Frame, Menu, BooleanVar
 from file_operations import FileOperations
 from duplicate_finder import DuplicateFinder
 from duplicate_handler import DuplicateHandler
@@ -8,6 +8,7 @@ from statistics_dashboard import StatisticsDashboard
 from theme_manager import ThemeManager
 from file_search import FileSearchWindow
 from login_window import LoginWindow
+from undo_history_window import UndoHistoryWindow
 
 class FileOrganizer:
     def __init__(self, root, current_user):
@@ -40,9 +41,23 @@ class FileOrganizer:
         view_menu.add_separator()
         view_menu.add_command(label="Toggle Theme", command=self.toggle_theme)
         
+        # Options menu
+        options_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Options", menu=options_menu)
+        self.recursive_var = BooleanVar(value=self.file_ops.recursive)
+        options_menu.add_checkbutton(label="Include Subfolders (Recursive)",
+                                     variable=self.recursive_var,
+                                     command=self.toggle_recursive)
+        self.incremental_var = BooleanVar(value=self.file_ops.incremental)
+        options_menu.add_checkbutton(label="Skip Unchanged Files (Incremental)",
+                                     variable=self.incremental_var,
+                                     command=self.toggle_incremental)
+        
         # File menu
         file_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Undo History...", command=self.open_undo_history)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
     
     def setup_ui(self):
@@ -240,9 +255,21 @@ class FileOrganizer:
         self.status_label.config(text=f"✓ {result}")
     
     def undo(self):
-        result = self.file_ops.undo()
+        if self.file_ops.undo_in_background(self.root, self.undo_finished):
+            self.status_label.config(text="↩️  Restoring files...")
+        else:
+            self.status_label.config(text="ℹ️  An undo is already running.")
+    
+    def undo_finished(self, result):
         self.status_label.config(text=f"↩️  {result}")
     
+    def open_undo_history(self):
+        directory = self.file_ops.get_directory()
+        if not directory:
+            self.status_label.config(text="⚠️  Please select a directory first.")
+            return
+        UndoHistoryWindow(self.root, self.file_ops, self.status_label)
+    
     def find_duplicates(self):
         directory = self.file_ops.get_directory()
         if not directory:
@@ -277,11 +304,21 @@ class FileOrganizer:
             return
         
         try:
-            search_window = FileSearchWindow(self.root, directory)
+            search_window = FileSearchWindow(self.root, directory, self.config_manager)
             self.status_label.config(text="🔍 File search opened")
         except Exception as e:
             self.status_label.config(text=f"❌ Error opening search: {str(e)}")
     
+    def toggle_recursive(self):
+        self.file_ops.recursive = self.recursive_var.get()
+        mode = "including subfolders" if self.file_ops.recursive else "top level only"
+        self.status_label.config(text=f"📂 Organize mode: {mode}")
+    
+    def toggle_incremental(self):
+        self.file_ops.incremental = self.incremental_var.get()
+        mode = "only new or changed files" if self.file_ops.incremental else "all files"
+        self.status_label.config(text=f"📂 Organize scans {mode}")
+    
     def toggle_theme(self):
         # Theme toggle disabled - using fixed colorful Material Design
         self.status_label.config(text="🎨 Using Modern Material Design Theme")
@@ -0,0 +1,128 @@
+import re
+import time
+import shlex
+from datetime import datetime, timedelta
+from rule_engine import RuleEngine
+
+FIELDS = ('size', 'ext', 'modified', 'category')
+RANGE_RE = re.compile(r'^(>=|<=|>|<|=)?(.+)$')
+
+class MetadataQuery:
+    """Parse search text like 'ext:mkv size:>2GB modified:2024 holiday' into SQL.
+
+    size:     >2GB, <=10MB, 1MB..5MB, or a bare size meaning "at least"
+    modified: 2024, 2024-03, 2024-03-05 (with >, <, >=, <= or a..b), or 30d for the last 30 days
+    ext:      comma separated, with or without the dot
+    category: a category from the config; matches its extensions
+    Remaining words must all appear in the relative path.
+    """
+
+    def __init__(self, categories=None):
+        self.categories = {name.lower(): exts for name, exts in (categories or {}).items()}
+
+    @staticmethod
+    def is_structured(query):
+        return any(f"{field}:" in query.lower() for field in FIELDS)
+
+    def split(self, query):
+        lexer = shlex.shlex(query, posix=True)
+        lexer.whitespace_split = True
+        lexer.escape = ''  # keep backslashes in Windows paths
+        try:
+            return list(lexer)
+        except ValueError:
+            return query.split()
+
+    def parse(self, query):
+        """Returns (where_sql, params); raises ValueError for malformed terms"""
+        clauses = []
+        params = []
+        for token in self.split(query):
+            field, sep, value = token.partition(':')
+            field = field.lower()
+            if not sep or field not in FIELDS:
+                clauses.append("rel_path LIKE ? ESCAPE '\\'")
+                params.append('%' + self.escape_like(token) + '%')
+                continue
+            if not value:
+                raise ValueError(f"Missing value for {field}:")
+            sql, values = getattr(self, f"parse_{field}")(value)
+            clauses.append(sql)
+            params.extend(values)
+        return ' AND '.join(clauses) or '1', params
+
+    @staticmethod
+    def escape_like(text):
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _range(self, column, value, parse_bound):
+        """Comparison or a..b range on column; parse_bound returns the [start, end) span of one value"""
+        if '..' in value:
+            low, high = value.split('..', 1)
+            clauses = []
+            params = []
+            if low:
+                clauses.append(f"{column} >= ?")
+                params.append(parse_bound(low)[0])
+            if high:
+                clauses.append(f"{column} < ?")
+                params.append(parse_bound(high)[1])
+            return '(' + ' AND '.join(clauses or ['1']) + ')', params
+        op, text = RANGE_RE.match(value).groups()
+        start, end = parse_bound(text)
+        if op == '>':
+            return f"{column} >= ?", [end]
+        if op == '>=':
+            return f"{column} >= ?", [start]
+        if op == '<':
+            return f"{column} < ?", [start]
+        if op == '<=':
+            return f"{column} < ?", [end]
+        return f"({column} >= ? AND {column} < ?)", [start, end]
+
+    def parse_size(self, value):
+        def bound(text):
+            size = RuleEngine.parse_size(text)
+            return size, size + 1
+        if RANGE_RE.match(value).group(1) is None and '..' not in value:
+            value = '>=' + value
+        return self._range('size', value, bound)
+
+    def _date_span(self, text):
+        """[start, end) of a year, month or day, in nanoseconds"""
+        parts = text.split('-')
+        try:
+            if len(parts) == 1:
+                start = datetime(int(parts[0]), 1, 1)
+                end = datetime(start.year + 1, 1, 1)
+            elif len(parts) == 2:
+                start = datetime(int(parts[0]), int(parts[1]), 1)
+                end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+            else:
+                start = datetime.fromisoformat(text)
+                end = start + timedelta(days=1)
+        except ValueError:
+            raise ValueError(f"Invalid date: {text}")
+        return int(start.timestamp() * 1e9), int(end.timestamp() * 1e9)
+
+    def parse_modified(self, value):
+        m = re.match(r'^(\d+)d$', value.lower())
+        if m:
+            since = time.time() - int(m.group(1)) * 86400
+            return "mtime_ns >= ?", [int(since * 1e9)]
+        return self._range('mtime_ns', value, self._date_span)
+
+    def _ext_clause(self, exts):
+        if not exts:
+            return '0', []
+        return f"ext IN ({', '.join('?' * len(exts))})", list(exts)
+
+    def parse_ext(self, value):
+        exts = ['.' + e.strip().lower().lstrip('.') for e in value.split(',') if e.strip()]
+        return self._ext_clause(exts)
+
+    def parse_category(self, value):
+        exts = self.categories.get(value.lower())
+        if exts is None:
+            raise ValueError(f"Unknown category: {value}")
+        return self._ext_clause(exts)
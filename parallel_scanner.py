@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ParallelScanner:
+    """Walk a directory tree with one pool task per directory.
+
+    visit(rel_dir, path) runs on the pool and returns (result, subdirs);
+    each subdirectory becomes a new task as soon as its parent is listed,
+    so idle workers always pick up whatever directory is pending next and
+    a slow directory never holds up its siblings. Results are yielded in
+    the calling thread in a fixed pre-order (subdirectories by name),
+    however the work happened to be scheduled.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+
+    def walk(self, root, visit, cancelled=None):
+        """Yield (rel_dir, result) for root and every subdirectory visit returns"""
+        lock = threading.Lock()
+        futures = {}
+        stopped = threading.Event()
+
+        def task(rel_dir):
+            if stopped.is_set():
+                return None, []
+            path = os.path.join(root, rel_dir) if rel_dir else root
+            result, subdirs = visit(rel_dir, path)
+            subdirs = sorted(subdirs)
+            with lock:
+                if not stopped.is_set():
+                    for sub in subdirs:
+                        futures[sub] = pool.submit(task, sub)
+            return result, subdirs
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            with lock:
+                futures[''] = pool.submit(task, '')
+            # A parent's task registers its children before it returns, so by the
+            # time a directory is popped here its future already exists
+            stack = ['']
+            while stack:
+                if cancelled is not None and cancelled():
+                    return
+                rel_dir = stack.pop()
+                with lock:
+                    future = futures.pop(rel_dir)
+                result, subdirs = future.result()
+                yield rel_dir, result
+                stack.extend(reversed(subdirs))
+        finally:
+            stopped.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def list_dir(self, path):
+        """(files as [(name, stat_result)], subdir names) using DirEntry's cached stat"""
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append((entry.name, entry.stat()))
+                except OSError:
+                    continue
+        return files, subdirs
@@ -0,0 +1,176 @@
+import re
+import time
+import fnmatch
+from datetime import datetime
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+class RuleEngine:
+    """Ordered classification rules compiled into a first-match-wins matcher.
+
+    A rule is a dict from the "rules" list in the config, e.g.
+        {"name": "Large", "folder": "Large", "min_size": "1GB"}
+        {"name": "Screenshots", "folder": "Screenshots", "name_glob": "Screenshot*"}
+    Supported predicates: name_glob, name_regex, extensions, path_prefix,
+    min_size/max_size, min_age_days/max_age_days, modified_after/modified_before.
+    Rules with a higher "priority" are tried first, ties keep config order.
+    A rule without a folder keeps matching files where they are.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = []
+        self.hits = {}
+        self.now = time.time()
+        self.compile(rules or [])
+
+    @staticmethod
+    def parse_size(value):
+        if value is None or value == '':
+            return None
+        if isinstance(value, (int, float)):
+            return int(value)
+        m = re.match(r'^\s*([\d.]+)\s*([KMGT]?B?)\s*$', str(value).upper())
+        if not m:
+            raise ValueError(f"Invalid size: {value}")
+        unit = m.group(2)
+        if unit and not unit.endswith('B'):
+            unit += 'B'
+        return int(float(m.group(1)) * SIZE_UNITS[unit])
+
+    @staticmethod
+    def parse_date(value):
+        if value is None or value == '':
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        return datetime.fromisoformat(str(value)).timestamp()
+
+    def normalize_rule(self, rule):
+        """Validate a rule dict, returning a cleaned copy or None"""
+        if not isinstance(rule, dict):
+            return None
+        out = {}
+        for key in ('name', 'folder', 'name_glob', 'name_regex', 'path_prefix'):
+            if rule.get(key):
+                out[key] = str(rule[key])
+        try:
+            if out.get('name_regex'):
+                re.compile(out['name_regex'])
+            for key in ('min_size', 'max_size'):
+                if rule.get(key) not in (None, ''):
+                    self.parse_size(rule[key])
+                    out[key] = rule[key]
+            for key in ('min_age_days', 'max_age_days'):
+                if rule.get(key) not in (None, ''):
+                    out[key] = float(rule[key])
+            for key in ('modified_after', 'modified_before'):
+                if rule.get(key) not in (None, ''):
+                    self.parse_date(rule[key])
+                    out[key] = rule[key]
+            out['priority'] = int(rule.get('priority', 0))
+        except (ValueError, TypeError, re.error):
+            return None
+        exts = rule.get('extensions')
+        if isinstance(exts, list):
+            out['extensions'] = [str(e).strip().lower() for e in exts if str(e).strip()]
+        return out
+
+    def compile(self, rules):
+        compiled = []
+        seen_names = set()
+        for order, rule in enumerate(rules):
+            name = rule.get('name') or f"Rule {order + 1}"
+            if name in seen_names:
+                name = f"{name} ({order + 1})"
+            seen_names.add(name)
+
+            # Globs must match the whole name, regexes may match anywhere in it
+            name_tests = []
+            if rule.get('name_glob'):
+                name_tests.append(re.compile(fnmatch.translate(rule['name_glob']), re.IGNORECASE).match)
+            if rule.get('name_regex'):
+                name_tests.append(re.compile(rule['name_regex'], re.IGNORECASE).search)
+
+            exts = None
+            if rule.get('extensions'):
+                exts = tuple(e if e.startswith('.') else '.' + e for e in rule['extensions'])
+
+            after = self.parse_date(rule.get('modified_after'))
+            before = self.parse_date(rule.get('modified_before'))
+            compiled.append({
+                'name': name,
+                'folder': rule.get('folder') or None,
+                'priority': rule.get('priority', 0),
+                'order': order,
+                'prefix': (rule.get('path_prefix') or '').replace('\\', '/').strip('/').lower() or None,
+                'exts': exts,
+                'name_tests': name_tests,
+                'min_size': self.parse_size(rule.get('min_size')),
+                'max_size': self.parse_size(rule.get('max_size')),
+                'min_age': rule.get('min_age_days'),
+                'max_age': rule.get('max_age_days'),
+                'after': after,
+                'before': before,
+                'needs_stat': any(v is not None for v in (
+                    rule.get('min_size'), rule.get('max_size'),
+                    rule.get('min_age_days'), rule.get('max_age_days'), after, before)),
+            })
+
+        compiled.sort(key=lambda r: (-r['priority'], r['order']))
+        self.rules = compiled
+        self.hits = {r['name']: 0 for r in compiled}
+        return compiled
+
+    def uses_stat(self):
+        """True if any rule looks at size or modification time"""
+        return any(rule['needs_stat'] for rule in self.rules)
+
+    def start_run(self):
+        """Reset hit counts and pin the clock used for age predicates"""
+        self.now = time.time()
+        self.hits = {r['name']: 0 for r in self.rules}
+
+    def match(self, name, rel_path, entry):
+        """Return the first matching rule for a scandir entry, or None"""
+        if not self.rules:
+            return None
+        lower_name = name.lower()
+        rel = rel_path.replace('\\', '/').lower()
+        st = None
+
+        for rule in self.rules:
+            # Cheap string checks first, stat results only when a rule needs them
+            if rule['prefix'] and not (rel == rule['prefix'] or rel.startswith(rule['prefix'] + '/')):
+                continue
+            if rule['exts'] and not lower_name.endswith(rule['exts']):
+                continue
+            if rule['name_tests'] and not all(test(name) for test in rule['name_tests']):
+                continue
+            if rule['needs_stat']:
+                if st is None:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                size = st.st_size
+                if rule['min_size'] is not None and size < rule['min_size']:
+                    continue
+                if rule['max_size'] is not None and size > rule['max_size']:
+                    continue
+                mtime = st.st_mtime
+                age_days = (self.now - mtime) / 86400.0
+                if rule['min_age'] is not None and age_days < rule['min_age']:
+                    continue
+                if rule['max_age'] is not None and age_days > rule['max_age']:
+                    continue
+                if rule['after'] is not None and mtime < rule['after']:
+                    continue
+                if rule['before'] is not None and mtime >= rule['before']:
+                    continue
+
+            self.hits[rule['name']] += 1
+            return rule
+        return None
+
+    def hit_summary(self):
+        return ", ".join(f"{name}: {count}" for name, count in self.hits.items() if count)
@@ -0,0 +1,258 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from parallel_scanner import ParallelScanner
+
+def cache_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '.search_cache')
+
+SCHEMA_VERSION = 3
+
+class SearchDatabase:
+    """Persistent per-root file index in SQLite, with an FTS5 table on name and path.
+
+    Rows are kept in sync with the tree by refresh(), which runs in the
+    background and only writes rows that changed, so size and mtime queries
+    are answered from the column indexes alone. The ext column holds the
+    config's split_extension, e.g. .tar.gz.
+    """
+
+    def __init__(self, root, config_manager, path=None):
+        self.root = os.path.abspath(root)
+        self.config_manager = config_manager
+        if path is None:
+            key = hashlib.sha1(os.path.normcase(self.root).encode('utf-8')).hexdigest()
+            os.makedirs(cache_dir(), exist_ok=True)
+            path = os.path.join(cache_dir(), f"{key}.db")
+        self.path = path
+        self.scanner = ParallelScanner()
+        self.lock = threading.Lock()
+        self.conn = self.connect()
+        self.has_fts = False
+        self.create_schema()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def create_schema(self):
+        with self.lock, self.conn:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # The database is only a cache of the tree; rebuild rather than migrate
+                self.conn.executescript("""
+                    DROP TABLE IF EXISTS files_fts;
+                    DROP TABLE IF EXISTS files;
+                    DROP TABLE IF EXISTS dirs;
+                    DROP TABLE IF EXISTS contents;
+                    DROP TABLE IF EXISTS content_state;
+                    DROP TABLE IF EXISTS settings;
+                """)
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    rel_path TEXT UNIQUE NOT NULL,
+                    name TEXT NOT NULL,
+                    dir TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    ino INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+                CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+                CREATE INDEX IF NOT EXISTS files_size ON files(size);
+                CREATE INDEX IF NOT EXISTS files_mtime ON files(mtime_ns);
+                CREATE TABLE IF NOT EXISTS dirs (
+                    rel_dir TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime_ns INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+            self._update_extensions()
+            try:
+                # The trigram tokenizer (SQLite 3.34+) makes MATCH a substring search
+                self.conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                        name, rel_path, content='files', content_rowid='id',
+                        tokenize='trigram case_sensitive 0'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                        INSERT INTO files_fts(rowid, name, rel_path)
+                        VALUES (new.id, new.name, new.rel_path);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                        INSERT INTO files_fts(files_fts, rowid, name, rel_path)
+                        VALUES ('delete', old.id, old.name, old.rel_path);
+                    END;
+                """)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+
+    def _update_extensions(self):
+        """Recompute the ext column if the configured multi-part extensions changed"""
+        multi_part = ' '.join(sorted(ext for ext in self.config_manager.ext_index if ext.count('.') > 1))
+        row = self.conn.execute("SELECT value FROM settings WHERE key = 'extensions'").fetchone()
+        if row is not None and row[0] == multi_part:
+            return
+        split_extension = self.config_manager.split_extension
+        self.conn.executemany("UPDATE files SET ext = ? WHERE id = ?", [
+            (split_extension(name), file_id)
+            for file_id, name in self.conn.execute("SELECT id, name FROM files").fetchall()
+        ])
+        self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('extensions', ?)",
+                          (multi_part,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def is_indexed(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM dirs LIMIT 1").fetchone() is not None
+
+    def load_entries(self):
+        """Return (ids, entries) ordered by id, entries as (filename, file_path, rel_path)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT id, name, rel_path FROM files ORDER BY id").fetchall()
+        root = self.root
+        ids = [r[0] for r in rows]
+        entries = [(name, os.path.join(root, rel_path), rel_path) for _, name, rel_path in rows]
+        return ids, entries
+
+    def iter_entries(self, batch_size=2000):
+        """Yield (ids, entries) batches in id order, like load_entries but incrementally"""
+        conn = self.connect()
+        try:
+            cursor = conn.execute("SELECT id, name, rel_path FROM files ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield ([r[0] for r in rows],
+                       [(name, os.path.join(self.root, rel_path), rel_path) for _, name, rel_path in rows])
+        finally:
+            conn.close()
+
+    def search(self, query):
+        """Ids of files whose name or relative path contains query"""
+        query = query.lower()
+        with self.lock:
+            if self.has_fts and len(query) >= 3:
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows = self.conn.execute(
+                    "SELECT rowid FROM files_fts WHERE files_fts MATCH ? ORDER BY rowid",
+                    (phrase,)).fetchall()
+            else:
+                pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                rows = self.conn.execute(
+                    "SELECT id FROM files WHERE rel_path LIKE ? ESCAPE '\\' ORDER BY id",
+                    (pattern,)).fetchall()
+        return [r[0] for r in rows]
+
+    def select(self, where, params=()):
+        """Ascending ids of files matching a WHERE clause over the files columns"""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT id FROM files WHERE {where} ORDER BY id",
+                                     params).fetchall()
+        return [r[0] for r in rows]
+
+    def _rel(self, rel_dir, name):
+        return os.path.join(rel_dir, name) if rel_dir else name
+
+    def refresh(self, cancelled=None, on_files=None):
+        """Bring the index up to date with the tree.
+
+        Every directory is listed, since editing a file in place leaves its
+        directory's mtime alone, but only rows whose name, size or mtime
+        changed are written. on_files, if given, receives
+        (ids, entries) for the rows each directory adds. Returns the number of
+        added, changed or removed files, or None if cancelled.
+        """
+        conn = self.connect()
+        changes = 0
+        try:
+            stored_dirs = {}
+            children = {}
+            for rel_dir, parent, mtime_ns in conn.execute("SELECT rel_dir, parent, mtime_ns FROM dirs"):
+                stored_dirs[rel_dir] = mtime_ns
+                if parent is not None:
+                    children.setdefault(parent, []).append(rel_dir)
+
+            def visit(rel_dir, path):
+                # Runs on the scanner's pool: ((mtime_ns, files or None if unreadable), subdirs)
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    return None, []
+                try:
+                    listed, names = self.scanner.list_dir(path)
+                except OSError:
+                    return (mtime_ns, None), children.get(rel_dir, [])
+                files = {name: (st.st_size, st.st_mtime_ns, st.st_ino) for name, st in listed}
+                return (mtime_ns, files), [self._rel(rel_dir, name) for name in names]
+
+            seen_dirs = set()
+            for rel_dir, result in self.scanner.walk(self.root, visit, cancelled):
+                if result is None:
+                    continue
+                seen_dirs.add(rel_dir)
+                mtime_ns, files = result
+                if files is not None:
+                    changes += self._apply_dir(conn, rel_dir, mtime_ns, files, on_files,
+                                               stored_dirs.get(rel_dir) == mtime_ns)
+            if cancelled is not None and cancelled():
+                return None
+
+            # Directories that disappeared take their files with them
+            gone = [d for d in stored_dirs if d not in seen_dirs]
+            with conn:
+                for rel_dir in gone:
+                    changes += conn.execute("DELETE FROM files WHERE dir = ?", (rel_dir,)).rowcount
+                    conn.execute("DELETE FROM dirs WHERE rel_dir = ?", (rel_dir,))
+        finally:
+            conn.close()
+        return changes
+
+    def _apply_dir(self, conn, rel_dir, mtime_ns, files, on_files=None, dir_unchanged=False):
+        """Diff one listed directory against its rows; files maps name -> (size, mtime_ns, ino)"""
+        known = {name: (size, mtime, ino) for name, size, mtime, ino in conn.execute(
+            "SELECT name, size, mtime_ns, ino FROM files WHERE dir = ?", (rel_dir,))}
+        if dir_unchanged and known == files:
+            return 0  # nothing to write, so no transaction either
+        changes = 0
+        added_ids = []
+        added = []
+        with conn:
+            for name in known.keys() - files.keys():
+                conn.execute("DELETE FROM files WHERE rel_path = ?", (self._rel(rel_dir, name),))
+                changes += 1
+            for name, meta in files.items():
+                if known.get(name) == meta:
+                    continue
+                if name in known:
+                    conn.execute("UPDATE files SET size = ?, mtime_ns = ?, ino = ? WHERE rel_path = ?",
+                                 (*meta, self._rel(rel_dir, name)))
+                else:
+                    rel_path = self._rel(rel_dir, name)
+                    cursor = conn.execute("INSERT INTO files (rel_path, name, dir, ext, size, mtime_ns, ino) "
+                                          "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                          (rel_path, name, rel_dir, self.config_manager.split_extension(name), *meta))
+                    added_ids.append(cursor.lastrowid)
+                    added.append((name, os.path.join(self.root, rel_path), rel_path))
+                changes += 1
+            conn.execute("INSERT OR REPLACE INTO dirs (rel_dir, parent, mtime_ns) VALUES (?, ?, ?)",
+                         (rel_dir, os.path.dirname(rel_dir) if rel_dir else None, mtime_ns))
+        if on_files is not None and added:
+            on_files((added_ids, added))
+        return changes
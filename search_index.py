@@ -0,0 +1,88 @@
+from array import array
+from bisect import bisect_left
+
+class TrigramIndex:
+    """Inverted index from 3-character substrings to file ids.
+
+    Each entry is indexed by its lowercased relative path, which also contains
+    the file name. Posting lists are ascending arrays of ids, so a query
+    intersects them with binary search and only verifies the survivors.
+    """
+
+    CHUNK_SIZE = 20000
+
+    def __init__(self):
+        self.texts = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _trigrams(self, text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, entries):
+        """Index (filename, file_path, rel_path) tuples; ids continue from len(self)"""
+        postings = self.postings
+        for filename, file_path, rel_path in entries:
+            doc_id = len(self.texts)
+            text = rel_path.lower()
+            self.texts.append(text)
+            for gram in self._trigrams(text):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(doc_id)
+
+    def build(self, entries):
+        self.texts = []
+        self.postings = {}
+        self.add(entries)
+
+    def _contains(self, posting, doc_id):
+        i = bisect_left(posting, doc_id)
+        return i < len(posting) and posting[i] == doc_id
+
+    def search(self, query, candidates=None, cancelled=None):
+        """Return ascending ids whose path contains query (case-insensitive).
+
+        candidates optionally restricts the search to a known superset of ids.
+        cancelled is polled between chunks; the search returns None once it is true.
+        """
+        query = query.lower()
+        texts = self.texts
+        if not query:
+            return list(candidates) if candidates is not None else list(range(len(texts)))
+
+        rest = []
+        if len(query) < 3:
+            pool = candidates if candidates is not None else range(len(texts))
+        else:
+            lists = []
+            for gram in self._trigrams(query):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return []
+                lists.append(posting)
+            lists.sort(key=len)
+
+            if candidates is not None and len(candidates) < len(lists[0]):
+                pool = candidates
+                rest = lists
+            else:
+                pool = lists[0]
+                rest = lists[1:]
+                if candidates is not None:
+                    allowed = set(candidates)
+                    pool = [i for i in pool if i in allowed]
+            # Postings that cover most files filter almost nothing; verifying is cheaper
+            rest = [p for p in rest if len(p) < len(texts) // 2][:2]
+
+        results = []
+        chunk = self.CHUNK_SIZE
+        for start in range(0, len(pool), chunk):
+            if cancelled is not None and cancelled():
+                return None
+            results.extend(i for i in pool[start:start + chunk]
+                           if all(self._contains(p, i) for p in rest) and query in texts[i])
+        return results
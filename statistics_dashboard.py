@@ -1,11 +1,37 @@
-from tkinter import Toplevel, Frame, Button
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from tkinter import Toplevel, Frame, Button, StringVar, PhotoImage
+from tkinter import ttk
+import time
+import queue
+import tempfile
+import threading
+from datetime import datetime
+import numpy as np
+from matplotlib import colormaps
 import os
-from collections import defaultdict
+import sqlite3
+from stats_cache import StatsCache
+from disk_usage import DiskUsage
+from stats_history import StatsHistory
+from chart_renderer import ChartRenderer
+
+SIZE_DECADES = ['<10 B', '10 B', '100 B', '1 KB', '10 KB', '100 KB', '1 MB',
+                '10 MB', '100 MB', '1 GB', '10 GB', '100 GB+']
+AGE_BINS_DAYS = [0, 1, 7, 30, 90, 365, 2 * 365, 5 * 365]
+AGE_LABELS = ['<1d', '1-7d', '1-4w', '1-3m', '3-12m', '1-2y', '2-5y', '5y+']
+PERCENTILES = [50, 90, 99]
+POLL_MS = 100
+CHART_SIZE = (4.9, 3.2)
+HISTORY_SIZE = (9.8, 3.4)
 
 class StatisticsDashboard:
+    """Charts over the files of one directory tree.
+    
+    Per-file sizes, mtimes and category ids are kept as NumPy arrays so the
+    aggregates are computed vectorized rather than per file. Analysis and
+    chart rendering run on a worker thread while the window shows
+    placeholders; each chart is a PNG cached by the data it plots, so an
+    unchanged tree reopens without drawing anything.
+    """
     
     def __init__(self, parent, directory, config_manager):
         self.parent = parent
@@ -13,95 +39,505 @@ class StatisticsDashboard:
         self.config_manager = config_manager
         self.window = Toplevel(parent)
         self.window.title("File Statistics Dashboard")
-        self.window.geometry("1000x700")
-        self.analyze_files()
+        self.window.geometry("1000x760")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.closed = False
+        self.history_path = None
+        self.chart_labels = {}
+        self.chart_images = {}
+        self.results = queue.Queue()
+        self.analyzing = False
         self.setup_ui()
+        self.start_analysis()
+    
+    def start_analysis(self, verify=False):
+        self.analyzing = True
+        self.charts_total = None
+        self.status.config(text="Verifying files..." if verify else "Analyzing files...")
+        threading.Thread(target=self.analyze_and_render, args=(verify,), daemon=True).start()
+        self.window.after(POLL_MS, self.poll_results)
+    
+    def rescan(self):
+        """Re-check every file's size and mtime, catching edits that left directory mtimes alone"""
+        if not self.analyzing:
+            self.start_analysis(verify=True)
     
-    def analyze_files(self):
-        self.category_count = defaultdict(int)
-        self.category_size = defaultdict(int)
-        self.extension_count = defaultdict(int)
+    def open_cache(self):
+        try:
+            return StatsCache(self.directory, self.config_manager)
+        except (sqlite3.Error, OSError):
+            # No usable cache location; aggregate in memory for this session only
+            return StatsCache(self.directory, self.config_manager, path=':memory:')
+    
+    def open_renderer(self):
+        try:
+            return ChartRenderer()
+        except OSError:
+            return ChartRenderer(tempfile.mkdtemp(prefix='stats_charts_'))
+    
+    def analyze_and_render(self, verify=False):
+        """Worker thread: aggregate, then render each chart, reporting through self.results"""
+        try:
+            self.analyze_files(verify)
+            self.percentiles = self.percentile_table()
+            charts = self.chart_specs()
+        except Exception as e:
+            # Anything escaping here would leave poll_results waiting forever
+            self.results.put(('error', str(e)))
+            return
+        if self.closed:
+            return
+        self.results.put(('analyzed', len(charts)))
+        
+        renderer = self.open_renderer()
+        # Charts already on disk are shown first, then the rest as they finish
+        charts.sort(key=lambda chart: renderer.cached(*chart[:3]) is None)
+        for name, size, data, plot in charts:
+            if self.closed:
+                return
+            try:
+                path = renderer.render(name, size, data, plot)
+            except Exception as e:
+                self.results.put(('chart', name, None, str(e)))
+                continue
+            self.results.put(('chart', name, path, None))
+        renderer.prune()
+    
+    def poll_results(self):
+        if self.closed:
+            return
+        while True:
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'error':
+                self.status.config(text=f"Could not analyze files: {message[1]}")
+                for label in self.chart_labels.values():
+                    label.config(text="No data available")
+                self.analyzing = False
+                return
+            if message[0] == 'analyzed':
+                self.charts_total = message[1]
+                self.charts_done = 0
+                self.fill_tables()
+            else:
+                self.show_chart(*message[1:])
+        if self.charts_total is None or self.charts_done < self.charts_total:
+            self.window.after(POLL_MS, self.poll_results)
+        else:
+            self.analyzing = False
+    
+    def show_chart(self, name, path, error):
+        self.charts_done += 1
+        label = self.chart_labels[name]
+        if path is None:
+            label.config(text=f"Could not render chart: {error}")
+        else:
+            # Tk only draws the image while a reference to it is kept
+            self.chart_images[name] = PhotoImage(file=path)
+            label.config(image=self.chart_images[name], text='')
+        if self.charts_done < self.charts_total:
+            self.status.config(text=f"Rendering charts ({self.charts_done}/{self.charts_total})...")
+        else:
+            self.status.config(text=f"{self.total_files} files, {self.format_size(self.total_size)}")
+    
+    def close(self):
+        self.closed = True
+        self.window.destroy()
+    
+    def analyze_files(self, verify=False):
+        self.category_count = {}
+        self.category_size = {}
+        self.extension_count = {}
         self.total_files = 0
         self.total_size = 0
+        self.category_names = []
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.mtimes = np.zeros(0, dtype=np.int64)
+        self.category_ids = np.zeros(0, dtype=np.int32)
+        self.disk_usage = DiskUsage([])
+        self.snapshots = []
         if not self.directory or not os.path.exists(self.directory):
             return
-        for root_dir, _, files in os.walk(self.directory):
-            for filename in files:
-                file_path = os.path.join(root_dir, filename)
-                if os.path.isfile(file_path):
-                    self.total_files += 1
-                    # Get file size
-                    try:
-                        size = os.path.getsize(file_path)
-                        self.total_size += size
-                    except:
-                        size = 0
-                    
-                    # Get extension and category
-                    ext = os.path.splitext(filename)[1].lower()
-                    category = self.config_manager.ext_to_category(ext)
-                    self.category_count[category] += 1
-                    self.category_size[category] += size
-                    self.extension_count[ext] += 1
+        # Only directories changed since the last visit are rescanned, unless verifying
+        cache = self.open_cache()
+        try:
+            cache.refresh(cancelled=lambda: self.closed, verify=verify)
+            totals = cache.totals()
+            self.total_files, self.total_size, by_category, by_ext = totals
+            self.load_arrays(cache, sorted(by_category))
+            self.disk_usage = DiskUsage(cache.iter_dir_records())
+            # At most one snapshot per StatsHistory.INTERVAL, taken as the dashboard is used
+            history = StatsHistory(cache.path)
+            try:
+                history.record(totals)
+                self.snapshots = history.snapshots()
+            finally:
+                history.close()
+            self.history_path = cache.path
+        finally:
+            cache.close()
+        for ext, (count, _) in by_ext.items():
+            self.extension_count[ext] = count
+        
+        counts = np.bincount(self.category_ids, minlength=len(self.category_names))
+        sizes = np.bincount(self.category_ids, weights=self.sizes, minlength=len(self.category_names))
+        for i, category in enumerate(self.category_names):
+            if counts[i]:
+                self.category_count[category] = int(counts[i])
+                self.category_size[category] = int(sizes[i])
+    
+    def load_arrays(self, cache, category_names):
+        """Concatenate the cached per-directory arrays under one category numbering"""
+        self.category_names = category_names
+        global_ids = {name: i for i, name in enumerate(category_names)}
+        sizes = []
+        mtimes = []
+        category_ids = []
+        for names, size_blob, mtime_blob, id_blob in cache.iter_file_arrays():
+            remap = np.array([global_ids[name] for name in names], dtype=np.int32)
+            sizes.append(np.frombuffer(size_blob, dtype=np.int64))
+            mtimes.append(np.frombuffer(mtime_blob, dtype=np.int64))
+            category_ids.append(remap[np.frombuffer(id_blob, dtype=np.uint16)])
+        if sizes:
+            self.sizes = np.concatenate(sizes)
+            self.mtimes = np.concatenate(mtimes)
+            self.category_ids = np.concatenate(category_ids)
+    
+    def size_histogram(self):
+        """File counts per power-of-ten size bucket"""
+        decades = np.floor(np.log10(np.maximum(self.sizes, 1))).astype(np.int64)
+        return np.bincount(np.minimum(decades, len(SIZE_DECADES) - 1), minlength=len(SIZE_DECADES))
+    
+    def age_histogram(self):
+        """(file counts, bytes) per age bucket, by modification time"""
+        ages = (time.time() - self.mtimes) / 86400.0
+        buckets = np.clip(np.digitize(ages, AGE_BINS_DAYS) - 1, 0, len(AGE_LABELS) - 1)
+        counts = np.bincount(buckets, minlength=len(AGE_LABELS))
+        sizes = np.bincount(buckets, weights=self.sizes, minlength=len(AGE_LABELS))
+        return counts, sizes
+    
+    def percentile_table(self):
+        """[(category, count, p50, p90, p99, max)] of file sizes, plus an 'All files' row"""
+        rows = []
+        if not len(self.sizes):
+            return rows
+        # One sort by (category, size) leaves each category's sizes as a sorted slice
+        order = np.lexsort((self.sizes, self.category_ids))
+        sorted_sizes = self.sizes[order]
+        bounds = np.searchsorted(self.category_ids[order], np.arange(len(self.category_names) + 1))
+        for i, category in enumerate(self.category_names):
+            part = sorted_sizes[bounds[i]:bounds[i + 1]]
+            if len(part):
+                rows.append((category, len(part), *np.percentile(part, PERCENTILES), part[-1]))
+        rows.append(('All files', len(self.sizes), *np.percentile(self.sizes, PERCENTILES),
+                     self.sizes.max()))
+        return rows
+    
+    def chart_specs(self):
+        """[(name, figsize, data, plot)]; data is plain JSON and all a plot draws from.
+        
+        The data doubles as the chart's cache key, so it holds the aggregates
+        as plotted rather than the time they were computed.
+        """
+        counts = [[category, count] for category, count in self.category_count.items()]
+        sizes = [[category, size] for category, size in self.category_size.items()]
+        top_exts = sorted(self.extension_count.items(), key=lambda x: x[1], reverse=True)[:10]
+        if len(self.sizes):
+            size_counts = [int(count) for count in self.size_histogram()]
+            age_counts, age_sizes = self.age_histogram()
+            ages = [[int(count), float(size)] for count, size in zip(age_counts, age_sizes)]
+        else:
+            size_counts = []
+            ages = []
+        history = [[taken_at, {category: size for category, (_, size) in by_category.items()}]
+                   for _, taken_at, _, _, by_category in self.snapshots]
+        return [
+            ('category_pie', CHART_SIZE, {'counts': counts, 'total': self.total_files},
+             self.plot_category_pie),
+            ('category_bar', CHART_SIZE, counts, self.plot_category_bar),
+            ('size_bar', CHART_SIZE, {'sizes': sizes, 'total': self.total_size}, self.plot_size_bar),
+            ('extension_bar', CHART_SIZE, [[ext, count] for ext, count in top_exts],
+             self.plot_extension_bar),
+            ('size_histogram', CHART_SIZE, size_counts, self.plot_size_histogram),
+            ('age_histogram', CHART_SIZE, ages, self.plot_age_histogram),
+            ('history', HISTORY_SIZE, history, self.plot_history),
+        ]
+    
+    def chart_label(self, parent, name):
+        label = ttk.Label(parent, text="Analyzing files...", anchor='center')
+        self.chart_labels[name] = label
+        return label
     
     def setup_ui(self):
-     
-        fig = Figure(figsize=(10, 7), facecolor='#f0f0f0')
+        notebook = ttk.Notebook(self.window)
+        notebook.pack(fill='both', expand=True)
+        overview = Frame(notebook)
+        distributions = Frame(notebook)
+        notebook.add(overview, text="Overview")
+        notebook.add(distributions, text="Distributions")
+        usage = Frame(notebook)
+        notebook.add(usage, text="Disk Usage")
+        history = Frame(notebook)
+        notebook.add(history, text="History")
         
-        # Plot 1: Files by Category (Pie Chart)
-        ax1 = fig.add_subplot(2, 2, 1)
-        self.plot_category_pie(ax1)
+        # One image per chart, filled in as each one is rendered
+        for i, name in enumerate(('category_pie', 'category_bar', 'size_bar', 'extension_bar')):
+            self.chart_label(overview, name).grid(row=i // 2, column=i % 2, sticky='nsew')
+        for i in range(2):
+            overview.rowconfigure(i, weight=1)
+            overview.columnconfigure(i, weight=1)
         
-        # Plot 2: File Count by Category (Bar Chart)
-        ax2 = fig.add_subplot(2, 2, 2)
-        self.plot_category_bar(ax2)
+        self.setup_distributions(distributions)
+        self.setup_disk_usage(usage)
+        self.setup_history(history)
         
-        # Plot 3: Storage Size by Category (Horizontal Bar)
-        ax3 = fig.add_subplot(2, 2, 3)
-        self.plot_size_bar(ax3)
+        # Button frame
+        button_frame = Frame(self.window)
+        button_frame.pack(fill='x', pady=10)
+        self.status = ttk.Label(button_frame, text="Analyzing files...")
+        self.status.pack(side='left', padx=10)
         
-        # Plot 4: Top Extensions (Bar Chart)
-        ax4 = fig.add_subplot(2, 2, 4)
-        self.plot_extension_bar(ax4)
+        Button(button_frame, text="Close", command=self.close,
+               bg="#2196F3", fg="white", font=("Arial", 10, "bold"),
+               padx=20, pady=5).pack(side='right', padx=10)
+        Button(button_frame, text="Rescan", command=self.rescan,
+               font=("Arial", 10), padx=10, pady=5).pack(side='right')
+    
+    def fill_tables(self):
+        """Populate the table views once analysis is done; charts follow separately"""
+        for label in self.chart_labels.values():
+            label.config(text="Rendering chart...")
+        self.status.config(text="Rendering charts...")
+        self.fill_percentiles()
+        self.fill_disk_usage()
+        self.fill_history()
+    
+    def setup_distributions(self, frame):
+        charts = Frame(frame)
+        charts.pack(fill='both', expand=True)
+        for name in ('size_histogram', 'age_histogram'):
+            self.chart_label(charts, name).pack(side='left', fill='both', expand=True)
         
-        fig.tight_layout(pad=3.0)
+        columns = ('category', 'files', 'p50', 'p90', 'p99', 'max')
+        self.percentile_view = ttk.Treeview(frame, columns=columns, show='headings', height=8)
+        for column, heading in zip(columns, ('Category', 'Files', 'Median', '90th pct',
+                                             '99th pct', 'Largest')):
+            self.percentile_view.heading(column, text=heading)
+            self.percentile_view.column(column, width=120, anchor='e' if column != 'category' else 'w')
+        self.percentile_view.pack(fill='x', padx=10, pady=5)
+    
+    def fill_percentiles(self):
+        self.percentile_view.delete(*self.percentile_view.get_children())
+        for category, count, p50, p90, p99, largest in self.percentiles:
+            self.percentile_view.insert('', 'end', values=(category, count, self.format_size(p50),
+                                                           self.format_size(p90), self.format_size(p99),
+                                                           self.format_size(largest)))
+    
+    def setup_disk_usage(self, frame):
+        """Folder tree with rolled-up sizes; the lists follow the selected folder"""
+        left = Frame(frame)
+        left.pack(side='left', fill='both', expand=True, padx=5, pady=5)
+        right = Frame(frame)
+        right.pack(side='left', fill='both', expand=True, padx=5, pady=5)
         
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.usage_tree = ttk.Treeview(left, columns=('size', 'files'))
+        self.usage_tree.heading('#0', text='Folder')
+        self.usage_tree.heading('size', text='Size')
+        self.usage_tree.heading('files', text='Files')
+        self.usage_tree.column('size', width=90, anchor='e')
+        self.usage_tree.column('files', width=70, anchor='e')
+        self.usage_tree.pack(fill='both', expand=True)
+        self.usage_tree.bind('<<TreeviewOpen>>', self.on_usage_open)
+        self.usage_tree.bind('<<TreeviewSelect>>', self.on_usage_select)
         
-        # Button frame
-        button_frame = Frame(self.window)
-        button_frame.pack(pady=10)
+        ttk.Label(right, text="Largest files").pack(anchor='w')
+        self.largest_files = ttk.Treeview(right, columns=('size',), height=10)
+        self.largest_files.heading('#0', text='File')
+        self.largest_files.heading('size', text='Size')
+        self.largest_files.column('size', width=90, anchor='e')
+        self.largest_files.pack(fill='both', expand=True)
+        ttk.Label(right, text="Largest folders").pack(anchor='w')
+        self.largest_dirs = ttk.Treeview(right, columns=('size', 'files'), height=10)
+        self.largest_dirs.heading('#0', text='Folder')
+        self.largest_dirs.heading('size', text='Size')
+        self.largest_dirs.heading('files', text='Files')
+        self.largest_dirs.column('size', width=90, anchor='e')
+        self.largest_dirs.column('files', width=70, anchor='e')
+        self.largest_dirs.pack(fill='both', expand=True)
+    
+    def fill_disk_usage(self):
+        self.usage_tree.delete(*self.usage_tree.get_children())
+        root_iid = self.insert_usage_node('', '')
+        self.usage_tree.item(root_iid, text=os.path.basename(os.path.abspath(self.directory or '.')))
+        self.usage_tree.item(root_iid, open=True)
+        self.populate_usage_children(root_iid)
+        self.usage_tree.selection_set(root_iid)
+    
+    def insert_usage_node(self, parent_iid, rel_dir):
+        size, files = self.disk_usage.total(rel_dir)
+        iid = 'dir:' + rel_dir
+        self.usage_tree.insert(parent_iid, 'end', iid=iid, text=os.path.basename(rel_dir),
+                               values=(self.format_size(size), files))
+        if self.disk_usage.children.get(rel_dir):
+            # Children are inserted when the node is first opened
+            self.usage_tree.insert(iid, 'end', iid=iid + '/...', text='...')
+        return iid
+    
+    def populate_usage_children(self, iid):
+        placeholder = iid + '/...'
+        if not self.usage_tree.exists(placeholder):
+            return
+        self.usage_tree.delete(placeholder)
+        for child in self.disk_usage.children_of(iid[len('dir:'):]):
+            self.insert_usage_node(iid, child)
+    
+    def on_usage_open(self, event=None):
+        iid = self.usage_tree.focus()
+        if iid:
+            self.populate_usage_children(iid)
+    
+    def on_usage_select(self, event=None):
+        selection = self.usage_tree.selection()
+        if not selection or not selection[0].startswith('dir:'):
+            return
+        rel_dir = selection[0][len('dir:'):]
+        self.largest_files.delete(*self.largest_files.get_children())
+        for size, rel_path in self.disk_usage.top_files(rel_dir):
+            self.largest_files.insert('', 'end', text=rel_path, values=(self.format_size(size),))
+        self.largest_dirs.delete(*self.largest_dirs.get_children())
+        for size, files, sub_dir in self.disk_usage.top_dirs(rel_dir):
+            self.largest_dirs.insert('', 'end', text=sub_dir, values=(self.format_size(size), files))
+    
+    def setup_history(self, frame):
+        self.chart_label(frame, 'history').pack(fill='both', expand=True)
         
-        Button(button_frame, text="Close", command=self.window.destroy,
-               bg="#2196F3", fg="white", font=("Arial", 10, "bold"),
-               padx=20, pady=5).pack()
+        controls = Frame(frame)
+        controls.pack(fill='x', padx=10, pady=5)
+        ttk.Label(controls, text="Changes since:").pack(side='left')
+        self.history_choices = {}
+        self.history_var = StringVar()
+        self.history_choice = ttk.Combobox(controls, textvariable=self.history_var,
+                                           state='readonly', width=20)
+        self.history_choice.pack(side='left', padx=5)
+        self.history_choice.bind('<<ComboboxSelected>>', self.show_history_diff)
+        self.history_summary = ttk.Label(controls, text="")
+        self.history_summary.pack(side='left', padx=10)
+        
+        self.history_table = ttk.Treeview(frame, columns=('files', 'bytes'), height=8)
+        self.history_table.heading('#0', text='Category')
+        self.history_table.heading('files', text='Files')
+        self.history_table.heading('bytes', text='Size')
+        self.history_table.column('files', width=100, anchor='e')
+        self.history_table.column('bytes', width=120, anchor='e')
+        self.history_table.pack(fill='x', padx=10, pady=5)
+    
+    def fill_history(self):
+        self.history_choices = {
+            datetime.fromtimestamp(taken_at).strftime('%Y-%m-%d %H:%M'): snap_id
+            for snap_id, taken_at, _, _, _ in self.snapshots[:-1]
+        }
+        self.history_choice.config(values=list(self.history_choices)[::-1])
+        if self.history_choices:
+            self.history_choice.current(0)
+            self.show_history_diff()
+        else:
+            self.history_summary.config(text="Only one snapshot so far; changes appear after the next one.")
+    
+    def show_history_diff(self, event=None):
+        """Category changes from the chosen snapshot to the latest one"""
+        old_id = self.history_choices.get(self.history_var.get())
+        if old_id is None or self.history_path is None:
+            return
+        history = StatsHistory(self.history_path)
+        try:
+            files, size, by_category, _ = history.diff(old_id, self.snapshots[-1][0])
+        finally:
+            history.close()
+        self.history_summary.config(text=f"{files:+d} files, {self.format_delta(size)}")
+        self.history_table.delete(*self.history_table.get_children())
+        for category, (count, delta) in sorted(by_category.items(), key=lambda item: -abs(item[1][1])):
+            self.history_table.insert('', 'end', text=category,
+                                      values=(f"{count:+d}", self.format_delta(delta)))
+    
+    def format_delta(self, size):
+        return ('+' if size >= 0 else '-') + self.format_size(abs(size))
     
-    def plot_category_pie(self, ax):
-        if not self.category_count:
-            ax.text(0.5, 0.5, 'No data available', 
+    # The plot_* methods run on the render thread: they draw only from their
+    # data argument and use the Figure API, never pyplot's global state.
+    
+    def rotate_labels(self, ax):
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+    
+    def plot_history(self, ax, history):
+        if len(history) < 2:
+            ax.text(0.5, 0.5, 'Not enough history yet (one snapshot per day)',
+                   ha='center', va='center', transform=ax.transAxes)
+            ax.set_title('Storage Growth')
+            return
+        dates = [datetime.fromtimestamp(taken_at) for taken_at, _ in history]
+        categories = sorted({c for _, by_category in history for c in by_category})
+        for category in categories:
+            sizes_gb = [by_category.get(category, 0) / (1024 ** 3) for _, by_category in history]
+            ax.plot(dates, sizes_gb, marker='o', markersize=3, label=category)
+        ax.set_ylabel('Size (GB)', fontweight='bold')
+        ax.set_title('Storage Growth by Category', fontweight='bold', fontsize=12)
+        ax.legend(loc='upper left', fontsize=8)
+        ax.figure.autofmt_xdate()
+    
+    def plot_size_histogram(self, ax, counts):
+        if not counts:
+            ax.text(0.5, 0.5, 'No data available',
+                   ha='center', va='center', transform=ax.transAxes)
+            ax.set_title('File Size Distribution')
+            return
+        ax.bar(SIZE_DECADES, counts, color='#4C72B0', edgecolor='black', linewidth=0.5)
+        ax.set_yscale('symlog')
+        ax.set_xlabel('File Size', fontweight='bold')
+        ax.set_ylabel('Number of Files', fontweight='bold')
+        ax.set_title('File Size Distribution (log scale)', fontweight='bold', fontsize=12)
+        self.rotate_labels(ax)
+    
+    def plot_age_histogram(self, ax, ages):
+        if not ages:
+            ax.text(0.5, 0.5, 'No data available',
+                   ha='center', va='center', transform=ax.transAxes)
+            ax.set_title('File Age')
+            return
+        counts = [count for count, _ in ages]
+        ax.bar(AGE_LABELS, counts, color='#55A868', edgecolor='black', linewidth=0.5)
+        for i, (count, size) in enumerate(ages):
+            ax.text(i, count, self.format_size(size), ha='center', va='bottom', fontsize=8)
+        ax.set_xlabel('Last Modified', fontweight='bold')
+        ax.set_ylabel('Number of Files', fontweight='bold')
+        ax.set_title('File Age (count, labelled with bytes)', fontweight='bold', fontsize=12)
+    
+    def plot_category_pie(self, ax, data):
+        if not data['counts']:
+            ax.text(0.5, 0.5, 'No data available',
                    ha='center', va='center', transform=ax.transAxes)
             ax.set_title('Files by Category')
             return
-        categories = list(self.category_count.keys())
-        counts = list(self.category_count.values())
-        colors = plt.cm.Set3(range(len(categories)))
-        ax.pie(counts, labels=categories, autopct='%1.1f%%', 
+        categories = [category for category, _ in data['counts']]
+        counts = [count for _, count in data['counts']]
+        colors = colormaps['Set3'](range(len(categories)))
+        ax.pie(counts, labels=categories, autopct='%1.1f%%',
                colors=colors, startangle=90)
-        ax.set_title(f'Files by Category\nTotal: {self.total_files} files', 
+        ax.set_title(f"Files by Category\nTotal: {data['total']} files",
                      fontweight='bold', fontsize=12)
     
-    def plot_category_bar(self, ax):
-        if not self.category_count:
-            ax.text(0.5, 0.5, 'No data available', 
+    def plot_category_bar(self, ax, data):
+        if not data:
+            ax.text(0.5, 0.5, 'No data available',
                    ha='center', va='center', transform=ax.transAxes)
             ax.set_title('File Count by Category')
             return
-        categories = list(self.category_count.keys())
-        counts = list(self.category_count.values())
-        colors = plt.cm.Paired(range(len(categories)))
+        categories = [category for category, _ in data]
+        counts = [count for _, count in data]
+        colors = colormaps['Paired'](range(len(categories)))
         bars = ax.bar(categories, counts, color=colors, edgecolor='black', linewidth=0.5)
         
         for bar in bars:
@@ -112,20 +548,19 @@ class StatisticsDashboard:
         ax.set_xlabel('Category', fontweight='bold')
         ax.set_ylabel('Number of Files', fontweight='bold')
         ax.set_title('File Count by Category', fontweight='bold', fontsize=12)
-        ax.tick_params(axis='x', rotation=45)
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+        self.rotate_labels(ax)
     
-    def plot_size_bar(self, ax):
-        if not self.category_size:
-            ax.text(0.5, 0.5, 'No data available', 
+    def plot_size_bar(self, ax, data):
+        if not data['sizes']:
+            ax.text(0.5, 0.5, 'No data available',
                    ha='center', va='center', transform=ax.transAxes)
             ax.set_title('Storage Size by Category')
             return
         
-        categories = list(self.category_size.keys())
-        sizes_mb = [size / (1024 * 1024) for size in self.category_size.values()]
+        categories = [category for category, _ in data['sizes']]
+        sizes_mb = [size / (1024 * 1024) for _, size in data['sizes']]
         
-        colors = plt.cm.Spectral(range(len(categories)))
+        colors = colormaps['Spectral'](range(len(categories)))
         bars = ax.barh(categories, sizes_mb, color=colors, edgecolor='black', linewidth=0.5)
         
         for i, bar in enumerate(bars):
@@ -135,24 +570,20 @@ class StatisticsDashboard:
         
         ax.set_xlabel('Size (MB)', fontweight='bold')
         ax.set_ylabel('Category', fontweight='bold')
-        ax.set_title(f'Storage Size by Category\nTotal: {self.format_size(self.total_size)}', 
+        ax.set_title(f"Storage Size by Category\nTotal: {self.format_size(data['total'])}",
                      fontweight='bold', fontsize=12)
     
-    def plot_extension_bar(self, ax):
-        if not self.extension_count:
-            ax.text(0.5, 0.5, 'No data available', 
+    def plot_extension_bar(self, ax, top_exts):
+        if not top_exts:
+            ax.text(0.5, 0.5, 'No data available',
                    ha='center', va='center', transform=ax.transAxes)
             ax.set_title('Top File Extensions')
             return
         
-      
-        sorted_exts = sorted(self.extension_count.items(), 
-                            key=lambda x: x[1], reverse=True)[:10]
-        
-        extensions = [ext if ext else '(no ext)' for ext, _ in sorted_exts]
-        counts = [count for _, count in sorted_exts]
+        extensions = [ext if ext else '(no ext)' for ext, _ in top_exts]
+        counts = [count for _, count in top_exts]
         
-        colors = plt.cm.viridis(range(len(extensions)))
+        colors = colormaps['viridis'](range(len(extensions)))
         bars = ax.bar(extensions, counts, color=colors, edgecolor='black', linewidth=0.5)
         
         # Add value labels
@@ -164,8 +595,7 @@ class StatisticsDashboard:
         ax.set_xlabel('File Extension', fontweight='bold')
         ax.set_ylabel('Count', fontweight='bold')
         ax.set_title('Top 10 File Extensions', fontweight='bold', fontsize=12)
-        ax.tick_params(axis='x', rotation=45)
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+        self.rotate_labels(ax)
     
     def format_size(self, size):
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -0,0 +1,256 @@
+import os
+import json
+import sqlite3
+import heapq
+import hashlib
+from array import array
+from parallel_scanner import ParallelScanner
+
+def cache_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), '.stats_cache')
+
+class StatsCache:
+    """Per-directory file statistics for one root, persisted in SQLite.
+
+    Each record covers the files directly inside one directory: count, bytes
+    and per-category / per-extension [count, bytes], plus packed per-file
+    sizes, mtimes and category indexes for vectorized analysis, and the
+    directory's largest files. refresh() rescans only directories whose
+    mtime changed (or whose records predate a change to the categories).
+    Editing a file in place leaves its directory's mtime alone, so
+    refresh(verify=True) also lists the others and rescans those whose
+    files no longer match the record's digest. totals() adds the records up.
+    """
+
+    SCHEMA_VERSION = 4
+    TOP_FILES = 20  # largest files remembered per directory
+
+    def __init__(self, root, config_manager, path=None, max_workers=8):
+        self.root = os.path.abspath(root)
+        self.config_manager = config_manager
+        self.scanner = ParallelScanner(max_workers)
+        if path is None:
+            key = hashlib.sha1(os.path.normcase(self.root).encode('utf-8')).hexdigest()
+            os.makedirs(cache_dir(), exist_ok=True)
+            path = os.path.join(cache_dir(), f"{key}.db")
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.create_schema()
+
+    def create_schema(self):
+        with self.conn:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS dirs")
+                self.conn.execute("DROP TABLE IF EXISTS summary")
+                self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dirs (
+                    rel_dir TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime_ns INTEGER,
+                    fingerprint TEXT,
+                    files_digest TEXT,
+                    count INTEGER,
+                    bytes INTEGER,
+                    by_category TEXT,
+                    by_ext TEXT,
+                    subdirs TEXT,
+                    sizes BLOB,
+                    mtimes BLOB,
+                    category_ids BLOB,
+                    largest TEXT
+                );
+                CREATE TABLE IF NOT EXISTS summary (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    totals TEXT
+                );
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def fingerprint(self):
+        """Changes whenever the extension -> category mapping does"""
+        config = self.config_manager.get_config()
+        data = json.dumps([config.get('categories', {}), config.get('default_folder', 'Others')],
+                          sort_keys=True)
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def files_digest(identities):
+        """Digest of a directory's (name, size, mtime_ns) file identities"""
+        return hashlib.sha1(json.dumps(sorted(identities)).encode('utf-8')).hexdigest()
+
+    def list_identities(self, path):
+        """(name, size, mtime_ns) of the files directly in path"""
+        identities = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # The same files scan_dir counts
+                    if entry.is_dir(follow_symlinks=False) or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    identities.append((entry.name, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    continue
+        return identities
+
+    def scan_dir(self, rel_dir, path):
+        """Aggregate the files directly in one directory; returns (record, subdirs).
+        
+        The record also carries int64 sizes and mtimes (seconds) per file and a
+        uint16 index per file into the record's by_category keys, and the
+        files_digest of the directory's files.
+        """
+        classify = self.config_manager.classify_name
+        count = 0
+        total = 0
+        by_category = {}
+        by_ext = {}
+        subdirs = []
+        sizes = array('q')
+        mtimes = array('q')
+        category_ids = array('H')
+        category_index = {}
+        largest = []  # min-heap of (size, name), at most TOP_FILES long
+        identities = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(os.path.join(rel_dir, entry.name) if rel_dir else entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                size = st.st_size
+                identities.append((entry.name, size, st.st_mtime_ns))
+                ext, category = classify(entry.name)
+                count += 1
+                total += size
+                sizes.append(size)
+                mtimes.append(int(st.st_mtime))
+                category_ids.append(category_index.setdefault(category, len(category_index)))
+                if len(largest) < self.TOP_FILES:
+                    heapq.heappush(largest, (size, entry.name))
+                elif size > largest[0][0]:
+                    heapq.heapreplace(largest, (size, entry.name))
+                for key, table in ((category, by_category), (ext, by_ext)):
+                    slot = table.get(key)
+                    if slot is None:
+                        table[key] = [1, size]
+                    else:
+                        slot[0] += 1
+                        slot[1] += size
+        largest.sort(reverse=True)
+        return (count, total, by_category, by_ext, sizes, mtimes, category_ids, largest,
+                self.files_digest(identities)), subdirs
+
+    def refresh(self, cancelled=None, verify=False):
+        """Bring the records up to date; returns the number of rescanned directories, None if cancelled.
+        
+        verify also re-checks the files of directories whose mtime is unchanged,
+        at the cost of a stat per file.
+        """
+        fingerprint = self.fingerprint()
+        stored = {rel_dir: (mtime_ns, fp, json.loads(subdirs), digest)
+                  for rel_dir, mtime_ns, fp, subdirs, digest in self.conn.execute(
+                      "SELECT rel_dir, mtime_ns, fingerprint, subdirs, files_digest FROM dirs")}
+
+        def visit(rel_dir, path):
+            # Runs on the scanner's pool; returns ((mtime_ns, record or None to keep), subdirs)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                return None, []
+            record = stored.get(rel_dir)
+            if record is not None and record[0] == mtime_ns and record[1] == fingerprint:
+                if not verify:
+                    return (mtime_ns, None), record[2]
+                # Same entries, but files may have been rewritten in place
+                try:
+                    if self.files_digest(self.list_identities(path)) == record[3]:
+                        return (mtime_ns, None), record[2]
+                except OSError:
+                    return (mtime_ns, None), record[2]
+            try:
+                data, subdirs = self.scan_dir(rel_dir, path)
+            except OSError:
+                # Unreadable for now; keep whatever was recorded before
+                return ((mtime_ns, None), record[2]) if record is not None else (None, [])
+            return (mtime_ns, (data, subdirs)), subdirs
+
+        seen = set()
+        rescanned = 0
+        with self.conn:
+            for rel_dir, result in self.scanner.walk(self.root, visit, cancelled):
+                if result is None:
+                    continue
+                seen.add(rel_dir)
+                mtime_ns, data = result
+                if data is None:
+                    continue
+                (count, total, by_category, by_ext,
+                 sizes, mtimes, category_ids, largest, digest), subdirs = data
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (rel_dir, os.path.dirname(rel_dir) if rel_dir else None, mtime_ns, fingerprint, digest,
+                     count, total, json.dumps(by_category), json.dumps(by_ext), json.dumps(subdirs),
+                     sizes.tobytes(), mtimes.tobytes(), category_ids.tobytes(), json.dumps(largest)))
+                rescanned += 1
+
+            if cancelled is not None and cancelled():
+                if rescanned:
+                    self.conn.execute("DELETE FROM summary")
+                return None
+            gone = [(d,) for d in stored if d not in seen]
+            self.conn.executemany("DELETE FROM dirs WHERE rel_dir = ?", gone)
+            if rescanned or gone:
+                self.conn.execute("DELETE FROM summary")
+        return rescanned
+
+    def totals(self):
+        """(files, bytes, {category: [count, bytes]}, {ext: [count, bytes]}) over the whole tree"""
+        row = self.conn.execute("SELECT totals FROM summary").fetchone()
+        if row is not None:
+            return tuple(json.loads(row[0]))
+
+        files = 0
+        total = 0
+        by_category = {}
+        by_ext = {}
+        for count, size, categories, exts in self.conn.execute(
+                "SELECT count, bytes, by_category, by_ext FROM dirs"):
+            files += count
+            total += size
+            for table, part in ((by_category, categories), (by_ext, exts)):
+                for key, (n, b) in json.loads(part).items():
+                    slot = table.get(key)
+                    if slot is None:
+                        table[key] = [n, b]
+                    else:
+                        slot[0] += n
+                        slot[1] += b
+        totals = (files, total, by_category, by_ext)
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO summary VALUES (0, ?)", (json.dumps(totals),))
+        return totals
+
+    def iter_file_arrays(self):
+        """Yield (category names, sizes, mtimes, category_ids) blobs per directory.
+
+        category_ids index into that directory's category names; the blobs are
+        native-endian int64, int64 and uint16 arrays.
+        """
+        for categories, sizes, mtimes, category_ids in self.conn.execute(
+                "SELECT by_category, sizes, mtimes, category_ids FROM dirs WHERE count > 0"):
+            yield list(json.loads(categories)), sizes, mtimes, category_ids
+
+    def iter_dir_records(self):
+        """Yield (rel_dir, parent, files, bytes, [(size, name)] largest first) per directory"""
+        for rel_dir, parent, count, size, largest in self.conn.execute(
+                "SELECT rel_dir, parent, count, bytes, largest FROM dirs"):
+            yield rel_dir, parent, count, size, [tuple(item) for item in json.loads(largest)]
@@ -0,0 +1,75 @@
+import json
+import time
+import sqlite3
+
+class StatsHistory:
+    """Periodic snapshots of a tree's aggregate statistics.
+
+    A snapshot is one row of totals plus per-category and per-extension
+    [count, bytes], so history costs a few hundred bytes per day however
+    large the tree is. The table lives in the statistics database but is
+    never dropped when the per-directory records are rebuilt.
+    """
+
+    INTERVAL = 24 * 3600  # seconds between automatic snapshots
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    taken_at REAL NOT NULL,
+                    files INTEGER,
+                    bytes INTEGER,
+                    by_category TEXT,
+                    by_ext TEXT
+                )
+            """)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, totals, force=False):
+        """Store totals as a snapshot if the last one is older than INTERVAL; returns True if stored"""
+        now = time.time()
+        if not force:
+            row = self.conn.execute("SELECT MAX(taken_at) FROM snapshots").fetchone()
+            if row[0] is not None and now - row[0] < self.INTERVAL:
+                return False
+        files, size, by_category, by_ext = totals
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO snapshots (taken_at, files, bytes, by_category, by_ext) VALUES (?, ?, ?, ?, ?)",
+                (now, files, size, json.dumps(by_category), json.dumps(by_ext)))
+        return True
+
+    def snapshots(self):
+        """[(id, taken_at, files, bytes, {category: [count, bytes]})], oldest first"""
+        return [(snap_id, taken_at, files, size, json.loads(by_category))
+                for snap_id, taken_at, files, size, by_category in self.conn.execute(
+                    "SELECT id, taken_at, files, bytes, by_category FROM snapshots ORDER BY taken_at")]
+
+    def _load(self, snap_id):
+        row = self.conn.execute("SELECT files, bytes, by_category, by_ext FROM snapshots WHERE id = ?",
+                                (snap_id,)).fetchone()
+        if row is None:
+            raise KeyError(snap_id)
+        return row[0], row[1], json.loads(row[2]), json.loads(row[3])
+
+    @staticmethod
+    def _delta(old, new):
+        changes = {}
+        for key in old.keys() | new.keys():
+            old_count, old_bytes = old.get(key, (0, 0))
+            new_count, new_bytes = new.get(key, (0, 0))
+            if (old_count, old_bytes) != (new_count, new_bytes):
+                changes[key] = (new_count - old_count, new_bytes - old_bytes)
+        return changes
+
+    def diff(self, old_id, new_id):
+        """Changes from one snapshot to another: (files, bytes, {category: (dcount, dbytes)}, {ext: ...})"""
+        old_files, old_bytes, old_categories, old_exts = self._load(old_id)
+        new_files, new_bytes, new_categories, new_exts = self._load(new_id)
+        return (new_files - old_files, new_bytes - old_bytes,
+                self._delta(old_categories, new_categories), self._delta(old_exts, new_exts))
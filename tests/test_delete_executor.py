@@ -0,0 +1,46 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+pytest.importorskip('send2trash')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delete_executor import DeleteExecutor
+
+
+class ReserveFallbackPathTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.fallback = os.path.join(self.directory, 'trash')
+        self.executor = DeleteExecutor(self.fallback)
+
+    def test_free_name_is_claimed_on_disk(self):
+        path = self.executor.reserve_fallback_path('a.txt')
+        self.assertEqual(path, os.path.join(self.fallback, 'a.txt'))
+        self.assertTrue(os.path.exists(path))
+
+    def test_collisions_get_numbered_names(self):
+        os.makedirs(self.fallback)
+        open(os.path.join(self.fallback, 'a.txt'), 'w').close()
+        names = [os.path.basename(self.executor.reserve_fallback_path('a.txt')) for _ in range(3)]
+        self.assertEqual(names, ['a(1).txt', 'a(2).txt', 'a(3).txt'])
+
+    def test_name_created_after_indexing_is_not_reused(self):
+        self.executor.reserve_fallback_path('a.txt')  # indexes the folder
+        with open(os.path.join(self.fallback, 'b.txt'), 'w') as f:
+            f.write('keep me')
+        path = self.executor.reserve_fallback_path('b.txt')
+        self.assertEqual(os.path.basename(path), 'b(1).txt')
+        with open(os.path.join(self.fallback, 'b.txt')) as f:
+            self.assertEqual(f.read(), 'keep me')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicate_linker import DuplicateLinker
+
+
+class HardLinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.keep = self.write('keep.bin', b'same content')
+        self.dup = self.write('dup.bin', b'same content')
+        self.linker = DuplicateLinker(mode='hardlink')
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_duplicate_ends_up_on_kept_inode(self):
+        linked, errors, reclaimed = self.linker.link_group(self.keep, [self.dup])
+        self.assertEqual((linked, errors, reclaimed), ([self.dup], [], len(b'same content')))
+        self.assertEqual(os.stat(self.dup).st_ino, os.stat(self.keep).st_ino)
+        self.assertIsNone(self.linker.link_file(self.keep, self.dup))
+
+    def test_content_mismatch_leaves_duplicate_untouched(self):
+        other = self.write('other.bin', b'same contenT')
+        inode = os.stat(other).st_ino
+        with self.assertRaises(ValueError):
+            self.linker.link_file(self.keep, other)
+        self.assertEqual(os.stat(other).st_ino, inode)
+        with open(other, 'rb') as f:
+            self.assertEqual(f.read(), b'same contenT')
+
+    def test_existing_temp_file_is_not_removed(self):
+        tmp = self.write(f".dup.bin.link-{os.getpid()}", b'someone else')
+        with self.assertRaises(FileExistsError):
+            self.linker.link_file(self.keep, self.dup)
+        with open(tmp, 'rb') as f:
+            self.assertEqual(f.read(), b'someone else')
+        self.assertNotEqual(os.stat(self.dup).st_ino, os.stat(self.keep).st_ino)
+
+
+if __name__ == '__main__':
+    unittest.main()
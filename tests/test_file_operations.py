@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+from file_operations import FileOperations, TRASH_FOLDER
+
+
+class IncrementalOrganizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name in ('photo.jpg', 'notes.txt', 'song.mp3'):
+            with open(os.path.join(self.directory, name), 'w') as f:
+                f.write(name)
+        self.file_ops = FileOperations(ConfigManager())
+        self.file_ops.directory = self.directory
+
+    def scanned_dirs(self):
+        """Organize once, returning the directories os.scandir was called on"""
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            self.file_ops.organize_files()
+        return [os.path.normpath(call.args[0]) for call in scandir.call_args_list]
+
+    def test_unchanged_rerun_does_not_scan_root(self):
+        self.assertIn(os.path.normpath(self.directory), self.scanned_dirs())
+        self.assertNotIn(os.path.normpath(self.directory), self.scanned_dirs())
+
+    def test_new_file_after_run_is_organized(self):
+        self.scanned_dirs()
+        with open(os.path.join(self.directory, 'later.jpg'), 'w') as f:
+            f.write('later')
+        self.assertIn(os.path.normpath(self.directory), self.scanned_dirs())
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'later.jpg')))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'Images', 'later.jpg')))
+
+    def test_age_rule_is_rechecked_in_unchanged_directory(self):
+        config_manager = self.file_ops.config_manager
+        config = dict(config_manager.get_config())
+        config['rules'] = [{"name": "Recent", "max_age_days": 1}]  # keep recent files in place
+        config_manager._apply_config(config)
+        self.file_ops.organize_files()
+        path = os.path.join(self.directory, 'notes.txt')
+        self.assertTrue(os.path.exists(path))
+        old = time.time() - 3 * 86400
+        os.utime(path, (old, old))
+        self.file_ops.organize_files()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'Documents', 'notes.txt')))
+
+    def test_recursive_run_skips_duplicates_trash(self):
+        trash = os.path.join(self.directory, TRASH_FOLDER)
+        os.mkdir(trash)
+        with open(os.path.join(trash, 'copy.jpg'), 'w') as f:
+            f.write('copy')
+        self.file_ops.recursive = True
+        previewed = [path for path, _ in self.file_ops.get_file_preview_list()]
+        self.assertNotIn(os.path.join(trash, 'copy.jpg'), previewed)
+        self.assertEqual(len(previewed), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
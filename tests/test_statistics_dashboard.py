@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('matplotlib')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_manager import ConfigManager
+from stats_cache import StatsCache
+from statistics_dashboard import StatisticsDashboard, SIZE_DECADES, AGE_LABELS
+
+DAY = 86400
+
+
+class DashboardAnalysisTest(unittest.TestCase):
+
+    # name, size in bytes, age in days
+    FILES = [
+        ('a.txt', 5, 0.5),
+        ('b.txt', 50, 3),
+        (os.path.join('sub', 'c.py'), 500, 40),
+        (os.path.join('sub', 'big.jpg'), 5000, 400),
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        now = time.time()
+        for name, size, age in self.FILES:
+            path = os.path.join(self.directory, name)
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+            os.utime(path, (now - age * DAY, now - age * DAY))
+        self.config_manager = ConfigManager()
+
+        # Only the analysis is exercised; no window is created
+        self.dashboard = StatisticsDashboard.__new__(StatisticsDashboard)
+        self.dashboard.directory = self.directory
+        self.dashboard.config_manager = self.config_manager
+        self.dashboard.closed = False
+        self.dashboard.open_cache = lambda: StatsCache(self.directory, self.config_manager,
+                                                       path=':memory:')
+        self.dashboard.analyze_files()
+
+    def totals(self):
+        cache = StatsCache(self.directory, self.config_manager, path=':memory:')
+        try:
+            cache.refresh()
+            return cache.totals()
+        finally:
+            cache.close()
+
+    def test_bincount_totals_match_cache(self):
+        files, size, by_category, _ = self.totals()
+        self.assertEqual(self.dashboard.total_files, files)
+        self.assertEqual(self.dashboard.total_size, size)
+        self.assertEqual(self.dashboard.category_count,
+                         {category: count for category, (count, _) in by_category.items()})
+        self.assertEqual(self.dashboard.category_size,
+                         {category: total for category, (_, total) in by_category.items()})
+
+    def test_size_histogram_buckets(self):
+        counts = self.dashboard.size_histogram()
+        self.assertEqual(len(counts), len(SIZE_DECADES))
+        # 5 B, 50 B, 500 B and 5000 B fall in the first four decades
+        self.assertEqual(list(counts[:4]), [1, 1, 1, 1])
+        self.assertEqual(counts[4:].sum(), 0)
+
+    def test_age_histogram_buckets(self):
+        counts, sizes = self.dashboard.age_histogram()
+        self.assertEqual(len(counts), len(AGE_LABELS))
+        expected = {'<1d': (1, 5), '1-7d': (1, 50), '1-3m': (1, 500), '1-2y': (1, 5000)}
+        for label, count, size in zip(AGE_LABELS, counts, sizes):
+            self.assertEqual((count, size), expected.get(label, (0, 0)), label)
+
+    def test_percentile_rows_per_category(self):
+        rows = {row[0]: row[1:] for row in self.dashboard.percentile_table()}
+        self.assertEqual(set(rows), {'Documents', 'Code', 'Images', 'All files'})
+        count, p50, p90, p99, largest = rows['Documents']
+        self.assertEqual((count, largest), (2, 50))
+        self.assertAlmostEqual(p50, 27.5)
+        self.assertAlmostEqual(p90, 45.5)
+        self.assertEqual(rows['Code'], (1, 500, 500, 500, 500))
+        self.assertEqual(rows['Images'], (1, 5000, 5000, 5000, 5000))
+        count, p50, _, _, largest = rows['All files']
+        self.assertEqual((count, largest), (4, 5000))
+        self.assertAlmostEqual(p50, 275)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+from tkinter import Toplevel, Frame, Label, Button, Scrollbar, StringVar, BOTH, LEFT, RIGHT, Y, W, END
+from tkinter import ttk, messagebox
+import time
+
+class UndoHistoryWindow:
+    
+    def __init__(self, parent, file_ops, status_label=None):
+        self.parent = parent
+        self.file_ops = file_ops
+        self.status_label = status_label
+        self.journal = file_ops.get_journal()
+        
+        self.window = Toplevel(parent)
+        self.window.title("Undo History")
+        self.window.geometry("650x400")
+        
+        self.setup_ui()
+        self.refresh()
+    
+    def setup_ui(self):
+        title_frame = Frame(self.window)
+        title_frame.pack(pady=10, padx=10, fill='x')
+        Label(title_frame, text="Organize History", 
+              font=("Arial", 14, "bold")).pack()
+        Label(title_frame, text=f"Directory: {self.file_ops.get_directory()}", 
+              font=("Arial", 9)).pack()
+        
+        list_frame = Frame(self.window)
+        list_frame.pack(pady=5, padx=10, fill=BOTH, expand=True)
+        
+        columns = ("Started", "Files", "Status")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', selectmode='browse')
+        self.tree.heading("Started", text="Started")
+        self.tree.heading("Files", text="Files")
+        self.tree.heading("Status", text="Status")
+        self.tree.column("Started", width=200, anchor=W)
+        self.tree.column("Files", width=80)
+        self.tree.column("Status", width=250, anchor=W)
+        self.tree.pack(side=LEFT, fill=BOTH, expand=True)
+        
+        scrollbar = Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        
+        self.info_var = StringVar(value="Select a run to undo")
+        Label(self.window, textvariable=self.info_var, font=("Arial", 9), fg="gray").pack(pady=5)
+        
+        button_frame = Frame(self.window)
+        button_frame.pack(pady=10, padx=10)
+        
+        Button(button_frame, text="Undo Selected Run", command=self.undo_selected,
+               bg="#9C27B0", fg="white", font=("Arial", 10, "bold"),
+               padx=15, pady=5).pack(side=LEFT, padx=5)
+        Button(button_frame, text="Close", command=self.window.destroy,
+               bg="#9E9E9E", fg="white", font=("Arial", 10, "bold"),
+               padx=15, pady=5).pack(side=LEFT, padx=5)
+    
+    def refresh(self):
+        for row in self.tree.get_children():
+            self.tree.delete(row)
+        
+        for run in self.journal.list_runs():
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['time'] or 0))
+            if run['reverted']:
+                status = "Undone"
+            elif run['missing']:
+                status = f"Partially undone ({run['undone']} restored, {run['missing']} missing)"
+            elif run['undone']:
+                status = f"Partially undone ({run['undone']} restored)"
+            elif not run['complete']:
+                status = "Interrupted"
+            else:
+                status = "Done"
+            self.tree.insert('', END, iid=run['run'], values=(started, run['moves'], status))
+    
+    def undo_selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Undo", "No run selected.", parent=self.window)
+            return
+        
+        if not self.file_ops.undo_in_background(self.window, self.undo_finished, selection[0]):
+            messagebox.showinfo("Undo", "An undo is already running.", parent=self.window)
+            return
+        self.info_var.set("Restoring files...")
+    
+    def undo_finished(self, result):
+        if self.status_label is not None:
+            self.status_label.config(text=f"↩️  {result}")
+        if not self.window.winfo_exists():
+            return
+        self.info_var.set(result)
+        self.refresh()
@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOURNAL_NAME = '.organizer_journal.jsonl'
+
+class UndoJournal:
+    """Append-only record of organize moves kept inside the organized directory.
+
+    Every move is written (and flushed) before it happens; fsync is batched.
+    Undo appends its own records, so an interrupted undo resumes where it stopped.
+    """
+
+    FSYNC_BATCH = 256
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self.lock = threading.Lock()
+        self.file = None
+        self.pending = 0
+        self.run_id = None
+        self.run_time = None
+        self.run_count = 0
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _append(self, record, sync=False):
+        with self.lock:
+            self._open()
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+            self.pending += 1
+            if sync or self.pending >= self.FSYNC_BATCH:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.file.close()
+                self.file = None
+                self.pending = 0
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.directory)
+
+    def _abs(self, rel_path):
+        return os.path.join(self.directory, rel_path)
+
+    def begin_run(self):
+        # The run header is only written with its first move, so no-op runs leave no trace
+        self.run_time = time.time()
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{int(self.run_time * 1000) % 1000:03d}"
+        self.run_count = 0
+        return self.run_id
+
+    def record_move(self, src, dst):
+        if self.run_count == 0:
+            self._append({"type": "run", "run": self.run_id, "time": self.run_time}, sync=True)
+        self._append({"type": "move", "run": self.run_id, "src": self._rel(src), "dst": self._rel(dst)})
+        self.run_count += 1
+
+    def end_run(self):
+        if self.run_id is not None and self.run_count:
+            self._append({"type": "end", "run": self.run_id, "count": self.run_count}, sync=True)
+        self.run_id = None
+        self.close()
+
+    def iter_records(self):
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash; everything before it is intact
+                    continue
+
+    def list_runs(self):
+        """Return run summaries, newest first"""
+        runs = {}
+        for rec in self.iter_records():
+            run = runs.get(rec.get('run'))
+            kind = rec.get('type')
+            if kind == 'run':
+                runs[rec['run']] = {"run": rec['run'], "time": rec.get('time'), "moves": 0,
+                                    "undone": 0, "missing": set(), "complete": False,
+                                    "reverted": False}
+            elif run is None:
+                continue
+            elif kind == 'move':
+                run['moves'] += 1
+            elif kind == 'end':
+                run['complete'] = True
+            elif kind == 'undo':
+                run['undone'] += 1
+            elif kind == 'missing':
+                run['missing'].add(rec.get('dst'))
+            elif kind == 'reverted':
+                run['reverted'] = True
+        for run in runs.values():
+            run['missing'] = len(run['missing'])
+        return sorted(runs.values(), key=lambda r: r['time'] or 0, reverse=True)
+
+    def last_undoable_run(self):
+        """Newest run with moves left to reverse; files known to be gone don't count"""
+        for run in self.list_runs():
+            if not run['reverted'] and run['moves'] > run['undone'] + run['missing']:
+                return run['run']
+        return None
+
+    def undo_run(self, run_id, max_workers=8):
+        """Reverse a run's moves in parallel; returns (restored, missing, errors).
+
+        The run is only marked reverted when every move came back; missing
+        files are journaled so the run shows as partially undone.
+        """
+        moves = {}
+        for rec in self.iter_records():
+            if rec.get('run') != run_id:
+                continue
+            if rec.get('type') == 'move':
+                moves[rec['dst']] = rec['src']
+            elif rec.get('type') == 'undo':
+                moves.pop(rec['dst'], None)
+
+        restored = []
+        missing = []
+        errors = []
+
+        def reverse(item):
+            dst_rel, src_rel = item
+            dst, src = self._abs(dst_rel), self._abs(src_rel)
+            try:
+                if not os.path.exists(dst):
+                    if os.path.exists(src):
+                        # Moved back already (undo was interrupted after the move)
+                        self._append({"type": "undo", "run": run_id, "dst": dst_rel})
+                    else:
+                        self._append({"type": "missing", "run": run_id, "dst": dst_rel})
+                        missing.append(src)
+                    return
+                if os.path.exists(src):
+                    errors.append((src, "a file already exists at the original location"))
+                    return
+                os.makedirs(os.path.dirname(src), exist_ok=True)
+                shutil.move(dst, src)
+                self._append({"type": "undo", "run": run_id, "dst": dst_rel})
+                restored.append(src)
+            except Exception as e:
+                errors.append((src, str(e)))
+
+        if moves:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(moves))) as pool:
+                list(pool.map(reverse, moves.items()))
+
+        if not errors and not missing:
+            self._append({"type": "reverted", "run": run_id, "time": time.time()}, sync=True)
+        self.close()
+        return restored, missing, errors